@@ -1,3 +1,12 @@
+import os
+import re
+import json
+from datetime import datetime
+from operator import itemgetter
+from urllib.parse import urlencode
+
+import streamlit as st
+
 # Optional: load .env locally. Safe on Streamlit Cloud even if python-dotenv isn't installed.
 try:
     from dotenv import load_dotenv
@@ -5,7 +14,10 @@ try:
 except Exception:
     pass
 
-from question_store import load_question_bank
+from question_store import answer_json, load_question_bank, prompt_table, tone_key
+from scoring import score_duo, score_solo, overall_score
+from reporting import DIMENSION_ORDER, DIMENSION_LABELS, build_headlines
+from growth_ui import render_growth_dashboard
 
 from db import (
     save_report,
@@ -20,13 +32,16 @@ from db import (
     end_session,
     save_response,
     get_answers_for_session,
-    get_last_answers,
+    get_last_answers_multi,
+    get_latest_answers_by_respondent,
+    get_histories_bulk,
     get_answer_history,
     create_invite,
     get_invite,
     mark_invite_used,
     archive_relationship,
     restore_relationship,
+    new_id,
 )
 
 from bugs import (
@@ -43,6 +58,7 @@ from bugs import (
 # -------------------- CONFIG --------------------
 st.set_page_config(page_title="SeeUs MVP", layout="centered")
 init_db()
+init_bugs_table()
 
 # If you set this on Streamlit Cloud (Secrets) or locally (env), the invite link becomes portable.
 BASE_APP_URL = (os.getenv("BASE_APP_URL") or "").strip() or "https://seeus-mvp-nfbw9pe3pclpgw4kchx9gh.streamlit.app"
@@ -50,61 +66,71 @@ BASE_APP_URL = (os.getenv("BASE_APP_URL") or "").strip() or "https://seeus-mvp-n
 # Optional: provide a default questions URL so local dev works even without secrets.toml/env.
 DEFAULT_QUESTIONS_URL = "https://raw.githubusercontent.com/dom-molloy/SeeUs-Question-Bank/main/questions_bank.json"
 
+# Widget options, built once instead of as fresh lists on every rerun.
+PAGES = ("Assess", "Report", "Growth", "Help")
+RESPONDENTS = ("A", "B", "solo")
+DUO_RESPONDENTS = ("A", "B")
+INVITE_RESPONDENTS = ("B", "A")
+MODES = ("solo", "duo")
+TONE_PROFILES = ("Gentle & supportive", "Clear & direct", "No sugarcoating")
+MIRROR_CHOICES = ("Yes", "Not quite")
+
 
 # -------------------- HELPERS --------------------
-def _get_setting(key: str, default: str = "") -> str:
-    # st.secrets throws if no secrets.toml exists; guard hard.
+@st.cache_resource(show_spinner=False)
+def _settings_snapshot() -> dict:
+    # Every top-level secret, read once per process: st.secrets parses secrets.toml on first
+    # access and throws if there isn't one, so guard hard but only here.
     try:
-        return str(st.secrets[key])
+        return {k: str(v) for k, v in st.secrets.items()}
     except Exception:
-        return str(os.getenv(key, default) or default)
+        return {}
 
-def _get_query_param(name: str):
-    # New Streamlit API
-    try:
-        v = st.query_params.get(name)
-        if isinstance(v, (list, tuple)):
-            return v[0] if v else None
+def _get_setting(key: str, default: str = "") -> str:
+    v = _settings_snapshot().get(key)
+    if v is not None:
         return v
-    except Exception:
-        pass
+    return str(os.getenv(key, default) or default)
 
-    # Old Streamlit API fallback
-    try:
-        qp = st.experimental_get_query_params()
-        v = qp.get(name, [None])
-        return v[0] if isinstance(v, list) else v
-    except Exception:
-        return None
+def _get_query_param(name: str):
+    # st.query_params returns the last value for a repeated key as a str (or None).
+    return st.query_params.get(name)
 
 def answered_ids(rows):
-    return set([r["question_id"] for r in rows])
+    return {r["question_id"] for r in rows}
 
 def latest_map(rows_desc):
     m = {}
-    for r in reversed(rows_desc):  # newest overwrites
-        m[r["question_id"]] = r["answer_text"]
+    for r in rows_desc:  # newest first, so keep the first one seen
+        m.setdefault(r["question_id"], r["answer_text"])
     return m
 def render_memory(rid):
     st.subheader("What I remember (latest answers)")
+    by_resp = _cached_last_answers_multi(rid, 6)
     c1, c2 = st.columns(2)
     with c1:
         st.markdown("**Latest (A / solo)**")
-        for r in get_last_answers(rid, respondent="A", limit=6) or []:
-            st.write(f"- {r['question_id']}: {str(r['answer_text'] or '')[:90]}")
-        for r in get_last_answers(rid, respondent="solo", limit=6) or []:
-            st.write(f"- {r['question_id']}: {str(r['answer_text'] or '')[:90]}")
+        for r in by_resp["A"]:
+            qid, txt = r["question_id"], r["answer_text"]
+            st.write(f"- {qid}: {str(txt or '')[:90]}")
+        for r in by_resp["solo"]:
+            qid, txt = r["question_id"], r["answer_text"]
+            st.write(f"- {qid}: {str(txt or '')[:90]}")
     with c2:
         st.markdown("**Latest (B)**")
-        for r in get_last_answers(rid, respondent="B", limit=6) or []:
-            st.write(f"- {r['question_id']}: {str(r['answer_text'] or '')[:90]}")
+        for r in by_resp["B"]:
+            qid, txt = r["question_id"], r["answer_text"]
+            st.write(f"- {qid}: {str(txt or '')[:90]}")
 
 
+# Fragment: flipping respondent/question here reruns only this panel, not the whole
+# report (which may include LLM scoring above it).
+@st.fragment
 def render_change_tracking(rid):
     st.subheader("Change tracking (last 3 answers per question)")
-    respondent = st.selectbox("Respondent", ["A", "B", "solo"], index=0)
-    qid = st.selectbox("Question", [q["id"] for q in QUESTIONS])
-    hist = get_answer_history(rid, respondent, qid, limit=3) or []
+    respondent = st.selectbox("Respondent", RESPONDENTS, index=0)
+    qid = st.selectbox("Question", QUESTION_IDS)
+    hist = _cached_answer_history(rid, respondent, qid, limit=3)
     if not hist:
         st.info("No history yet for that question.")
         return
@@ -112,25 +138,24 @@ def render_change_tracking(rid):
         st.markdown(f"**#{i+1} • {row['created_at']}**")
         st.write(row["answer_text"] or "(blank)")
         st.divider()
-def _tone_key(tone: str) -> str:
-    t = (tone or "Gentle").lower()
-    if "sugar" in t or "sharp" in t:
-        return "sharp"
-    if "clear" in t or "direct" in t:
-        return "clear"
-    if "gentle" in t:
-        return "gentle"
-    return "default"
-
 def _prompt_for(q, tone: str) -> str:
-    key = _tone_key(tone)
-    pr = q.get("prompt") or {}
-    return pr.get(key) or pr.get("default") or q.get("text") or ""
+    return PROMPTS.get((q["id"], tone_key(tone)), "")
+
+_NUM_RE = re.compile(r"(?<!\d)(\d+(?:\.\d+)?)")
 
 def _extract_first_0_10(text):
-    import re
-    nums = [float(x) for x in re.findall(r"(?<!\d)(\d+(?:\.\d+)?)", text or "")]
-    for n in nums:
+    t = (text or "").strip()
+    if not t:
+        return None
+    # Fast path: answers usually lead with the number ("7", "7.5 mostly").
+    # Only taken when the regex would match the same token, so results are unchanged.
+    head = t.split(None, 1)[0].rstrip(".,;:!?")
+    if head and head[0].isdecimal() and head[-1].isdecimal() and head.replace(".", "", 1).isdecimal():
+        n = float(head)
+        if 0 <= n <= 10:
+            return n
+    for m in _NUM_RE.finditer(t):
+        n = float(m.group(1))
         if 0 <= n <= 10:
             return n
     return None
@@ -141,6 +166,57 @@ def _is_archived_row(r) -> bool:
     except Exception:
         return False
 
+_REL_LABEL_FMT = "%s  •  %.8s%s"
+_rel_label_fields = itemgetter("label", "relationship_id")
+
+def _relationship_label(r) -> str:
+    label, rel_id = _rel_label_fields(r)
+    return _REL_LABEL_FMT % (label, rel_id, "  (archived)" if _is_archived_row(r) else "")
+
+
+# -------------------- CACHED READS --------------------
+# Every widget interaction reruns this script; these keep non-mutating reruns off SQLite.
+# sqlite3.Row isn't picklable, so rows are returned as dicts. Clear after the matching writes.
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_relationship_options(include_archived: bool):
+    # Rows plus their selectbox labels, so the labels aren't rebuilt on every rerun either.
+    rels = [dict(r) for r in list_relationships(include_archived=include_archived) or []]
+    return rels, [_relationship_label(r) for r in rels]
+
+# get_relationship keeps its own in-process cache in db.py.
+
+# PDF generation is slow; key on canonical JSON so identical brief+header reuse the bytes.
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def _pdf_cached(brief_json: str, header_json: str) -> bytes:
+    from pdf_export import brief_to_pdf_bytes  # reportlab; only loaded once a PDF is needed
+    return brief_to_pdf_bytes(json.loads(brief_json), header=json.loads(header_json))
+
+def _brief_pdf_bytes(brief, header) -> bytes:
+    return _pdf_cached(
+        json.dumps(brief, sort_keys=True, ensure_ascii=False),
+        json.dumps(header, sort_keys=True, ensure_ascii=False),
+    )
+
+def _clear_relationship_caches():
+    _cached_relationship_options.clear()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_answer_history(rid, respondent, question_id, limit=5):
+    return [dict(r) for r in get_answer_history(rid, respondent, question_id, limit=limit) or []]
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_last_answers_multi(rid, limit_per):
+    return {k: [dict(r) for r in rows] for k, rows in get_last_answers_multi(rid, RESPONDENTS, limit_per).items()}
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_latest_answers_by_respondent(rid):
+    return get_latest_answers_by_respondent(rid)
+
+def _clear_answer_caches():
+    _cached_answer_history.clear()
+    _cached_last_answers_multi.clear()
+    _cached_latest_answers_by_respondent.clear()
+
 
 # -------------------- INVITE LOCKING (ONE PLACE ONLY) --------------------
 token = _get_query_param("t")
@@ -161,17 +237,20 @@ if not REMOTE_QUESTIONS_URL:
 
 QUESTIONS = load_question_bank(REMOTE_QUESTIONS_URL)
 QUESTION_BY_ID = {q["id"]: q for q in QUESTIONS}
+QID_INDEX = {q["id"]: i for i, q in enumerate(QUESTIONS)}
+N_QUESTIONS = len(QUESTIONS)
+QUESTION_IDS = tuple(q["id"] for q in QUESTIONS)
 PRIMARY_IDS = [q["id"] for q in QUESTIONS if q.get("is_primary")]
+PRIMARY_IDS_SET = frozenset(PRIMARY_IDS)
+PROMPTS = prompt_table(REMOTE_QUESTIONS_URL)
 
 
 # -------------------- UI: SIDEBAR --------------------
-with st.sidebar:
-    st.header("SeeUs")
-    page = st.radio("Go to", ["Assess", "Report", "Growth", "Help"], index=0, key="page")
-
-    show_archived = st.toggle("Show archived relationships", value=False, key="show_archived")
-
-    st.divider()
+# Fragments: typing in these fields or pressing their buttons reruns only the form,
+# not the relationship lookups and Report/Assess work below. Called inside
+# `with st.sidebar:` because fragments can't write to the sidebar themselves.
+@st.fragment
+def _render_profile():
     st.subheader("Profile")
     user_id = st.text_input("Your ID", value=st.session_state.get("user_id", "pete"))
     display_name = st.text_input("Display name", value=st.session_state.get("display_name", "Pete"))
@@ -182,6 +261,40 @@ with st.sidebar:
         st.success("Saved.")
 
 
+@st.fragment
+def _render_create_relationship():
+    st.subheader("Create a relationship")
+    label = st.text_input("Label (e.g., 'Me + Tricia')")
+    other_id = st.text_input("Other person ID (optional)")
+
+    if st.button("Create"):
+        if not st.session_state.get("user_id"):
+            st.error("Set your profile in the sidebar first.")
+            return
+
+        new_rid = new_id()
+        create_relationship(
+            new_rid,
+            st.session_state["user_id"],
+            other_id.strip() or None,
+            label.strip() or "Untitled",
+        )
+        _clear_relationship_caches()
+        st.success(f"Created: {new_rid[:8]}")
+        st.rerun(scope="app")
+
+
+# -------------------- UI: SIDEBAR --------------------
+with st.sidebar:
+    st.header("SeeUs")
+    page = st.radio("Go to", PAGES, index=0, key="page")
+
+    show_archived = st.toggle("Show archived relationships", value=False, key="show_archived")
+
+    st.divider()
+    _render_profile()
+
+
 # -------------------- HEADER --------------------
 st.title("SeeUs — Relationship Mirror")
 st.caption("**_Created by Dom Molloy and Feliza Irvin_**")
@@ -224,34 +337,12 @@ if forced_rid:
     st.session_state["relationship_id"] = rid
 
 else:
-    rels = list_relationships(include_archived=include_archived) or []
-    rel_labels = [
-        f'{r["label"]}  •  {r["relationship_id"][:8]}' + ("  (archived)" if _is_archived_row(r) else "")
-        for r in rels
-    ]
+    rels, rel_labels = _cached_relationship_options(include_archived)
 
     selected = st.selectbox("Relationship", ["(new)"] + rel_labels, key="rel_select")
 
     if selected == "(new)":
-        st.subheader("Create a relationship")
-        label = st.text_input("Label (e.g., 'Me + Tricia')")
-        other_id = st.text_input("Other person ID (optional)")
-
-        if st.button("Create"):
-            if not st.session_state.get("user_id"):
-                st.error("Set your profile in the sidebar first.")
-                st.stop()
-
-            new_rid = str(uuid.uuid4())
-            create_relationship(
-                new_rid,
-                st.session_state["user_id"],
-                other_id.strip() or None,
-                label.strip() or "Untitled",
-            )
-            st.success(f"Created: {new_rid[:8]}")
-            st.rerun()
-
+        _render_create_relationship()
         st.stop()
 
     rid = rels[rel_labels.index(selected)]["relationship_id"]
@@ -263,10 +354,10 @@ st.caption(f"Relationship ID: {rid[:8]}  •  Stored in seeus.db")
 if not forced_rid:
     with st.expander("Invite link (Duo mode)"):
         st.write("Generate a tokenized link for Person B (or A).")
-        which = st.selectbox("Invite respondent", ["B", "A"], index=0)
+        which = st.selectbox("Invite respondent", INVITE_RESPONDENTS, index=0)
 
         if st.button("Create invite link"):
-            t = str(uuid.uuid4()).replace("-", "")
+            t = new_id().replace("-", "")
             create_invite(t, rid, which)
 
             BASE_APP_URL = "https://seeus-mvp-nfbw9pe3pclpgw4kchx9gh.streamlit.app"
@@ -287,6 +378,7 @@ if not forced_rid:
         st.warning("This relationship is archived.")
         if st.button("Restore relationship"):
             restore_relationship(rid)
+            _clear_relationship_caches()
             st.success("Restored.")
             st.rerun()
 
@@ -295,22 +387,85 @@ if not forced_rid:
         confirm_archive = st.checkbox("I understand this will archive the relationship.", key="confirm_archive")
         if st.button("Archive relationship", disabled=not confirm_archive):
             archive_relationship(rid)
+            _clear_relationship_caches()
             st.success("Archived.")
             st.rerun()
 
 
 
+def _render_deep_research_section(amap, scores, rid, relationship):
+    # Solo report only.
+    from research_packet import build_key_quotes, detect_contradictions, compute_deltas_over_time
+    from deep_research import run_deep_research
+    from render_brief import render_brief
+
+    st.subheader("Deep Research Mode")
+    st.caption("Generates a Relational Dynamics Brief grounded in your answers. Requires OPENAI_API_KEY.")
+    dr_model = st.text_input("Deep Research model", value="gpt-4o-mini")
+
+    if st.button("Generate Deep Research Brief"):
+        try:
+            key_quotes = build_key_quotes(amap, {}, mode="solo")
+            contradictions = detect_contradictions(amap, {}, mode="solo")
+            histories = get_histories_bulk(rid, ("solo",), QUESTION_IDS, limit=3)
+
+            def _history(_rid, who, qid, limit=3):
+                return histories.get((who, qid), [])[:limit]
+
+            deltas = compute_deltas_over_time(_history, rid, "solo", QUESTION_IDS, limit=3)
+
+            dimension_scores = [
+                {"dimension": dim_key, "score": float(tup[0]), "confidence": "Medium", "rationale": tup[2]}
+                for dim_key, tup in scores.items()
+            ]
+
+            brief = run_deep_research(
+                mode="solo",
+                dimension_scores=dimension_scores,
+                key_quotes=key_quotes,
+                contradictions=contradictions,
+                deltas_over_time=deltas,
+                model=dr_model.strip() or "gpt-4o-mini",
+            )
+
+            save_report(new_id(), rid, "deep", json.dumps(brief, ensure_ascii=False))
+            st.success("Deep Research Brief saved.")
+            render_brief(brief)
+
+            pdf_bytes = _brief_pdf_bytes(
+                brief,
+                header={
+                    "relationship_label": relationship["label"] if relationship else rid[:8],
+                    "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+                    "model": dr_model.strip() or "gpt-4o-mini",
+                },
+            )
+            st.download_button(
+                "Download PDF",
+                data=pdf_bytes,
+                file_name="seeus_relational_dynamics_brief.pdf",
+                mime="application/pdf",
+            )
+        except Exception as e:
+            st.error(f"Deep Research failed: {e}")
+            st.info("Tip: set OPENAI_API_KEY in your environment and restart Streamlit.")
+
+
 # -------------------- PAGE ROUTING --------------------
 if page == "Report":
     st.header("Report (MVP)")
 
-    rows_a = get_last_answers(rid, respondent="A", limit=500) or []
-    rows_b = get_last_answers(rid, respondent="B", limit=500) or []
-    rows_s = get_last_answers(rid, respondent="solo", limit=500) or []
+    # Report-only dependencies; Assess and Growth reruns never import them.
+    from llm_scoring import score_duo_llm, overall_from_llm
+
+    latest = _cached_latest_answers_by_respondent(rid)
+    latest_a = latest.get("A", {})
+    latest_b = latest.get("B", {})
+    latest_s = latest.get("solo", {})
 
     # ---------- SOLO REPORT ----------
-    if rows_s and not rows_a and not rows_b:
-        amap = latest_map(rows_s)
+    if latest_s and not latest_a and not latest_b:
+        amap = latest_s
         scores = score_solo(amap)
         st.metric("Overall (0–10)", f"{overall_score(scores):.1f}")
 
@@ -321,53 +476,7 @@ if page == "Report":
                 st.write(f"**{DIMENSION_LABELS.get(dim, dim)}:** {s:.1f}  (conf {conf:.2f})")
                 st.caption(notes)
 
-        st.subheader("Deep Research Mode")
-        st.caption("Generates a Relational Dynamics Brief grounded in your answers. Requires OPENAI_API_KEY.")
-        dr_model = st.text_input("Deep Research model", value="gpt-4o-mini")
-
-        if st.button("Generate Deep Research Brief"):
-            try:
-                bmap = {}
-                key_quotes = build_key_quotes(amap, bmap, mode="solo")
-                contradictions = detect_contradictions(amap, bmap, mode="solo")
-                qids = [q["id"] for q in QUESTIONS]
-                deltas = compute_deltas_over_time(get_answer_history, rid, "solo", qids, limit=3)
-
-                dimension_scores = [
-                    {"dimension": dim_key, "score": float(tup[0]), "confidence": "Medium", "rationale": tup[2]}
-                    for dim_key, tup in scores.items()
-                ]
-
-                brief = run_deep_research(
-                    mode="solo",
-                    dimension_scores=dimension_scores,
-                    key_quotes=key_quotes,
-                    contradictions=contradictions,
-                    deltas_over_time=deltas,
-                    model=dr_model.strip() or "gpt-4o-mini",
-                )
-
-                save_report(str(uuid.uuid4()), rid, "deep", json.dumps(brief, ensure_ascii=False))
-                st.success("Deep Research Brief saved.")
-                render_brief(brief)
-
-                pdf_bytes = brief_to_pdf_bytes(
-                    brief,
-                    header={
-                        "relationship_label": relationship["label"] if relationship else rid[:8],
-                        "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
-                        "model": dr_model.strip() or "gpt-4o-mini",
-                    },
-                )
-                st.download_button(
-                    "Download PDF",
-                    data=pdf_bytes,
-                    file_name="seeus_relational_dynamics_brief.pdf",
-                    mime="application/pdf",
-                )
-            except Exception as e:
-                st.error(f"Deep Research failed: {e}")
-                st.info("Tip: set OPENAI_API_KEY in your environment and restart Streamlit.")
+        _render_deep_research_section(amap, scores, rid, relationship)
 
         st.divider()
         render_change_tracking(rid)
@@ -376,9 +485,9 @@ if page == "Report":
         st.stop()
 
     # ---------- DUO REPORT ----------
-    if rows_a and rows_b:
-        amap = latest_map(rows_a)
-        bmap = latest_map(rows_b)
+    if latest_a and latest_b:
+        amap = latest_a
+        bmap = latest_b
 
         use_llm = st.toggle("Use LLM scoring (OpenAI)", value=False, help="Requires OPENAI_API_KEY in your environment.")
         model = st.text_input("Model", value="gpt-4o-mini")
@@ -434,7 +543,7 @@ if page == "Growth":
     sess_mode = open_sess["mode"] if open_sess else st.session_state.get("mode", "solo")
 
     if sess_mode == "duo":
-        resp = st.selectbox("View as", ["A", "B"], index=0)
+        resp = st.selectbox("View as", DUO_RESPONDENTS, index=0)
     else:
         resp = "solo"
 
@@ -448,7 +557,7 @@ st.header("Assess")
 st.subheader("Truth temperature")
 tone_profile = st.selectbox(
     "How direct do you want this to be?",
-    ["Gentle & supportive", "Clear & direct", "No sugarcoating"],
+    TONE_PROFILES,
     index=0,
 )
 st.session_state["tone_profile"] = tone_profile
@@ -457,7 +566,7 @@ st.session_state["tone_profile"] = tone_profile
 if forced_rid:
     mode = "duo"
 else:
-    mode = st.selectbox("Assessment mode", ["solo", "duo"], index=0)
+    mode = st.selectbox("Assessment mode", MODES, index=0)
 
 open_sess = get_open_session(rid)
 colA, colB = st.columns(2)
@@ -465,7 +574,7 @@ colA, colB = st.columns(2)
 with colA:
     if open_sess is None:
         if st.button("Start new session"):
-            sid = str(uuid.uuid4())
+            sid = new_id()
             create_session(sid, rid, mode, tone_profile=st.session_state.get("tone_profile"))
             st.session_state["session_id"] = sid
             st.session_state["mode"] = mode
@@ -474,9 +583,11 @@ with colA:
     else:
         st.info(f"Open session: {open_sess['session_id'][:8]} (mode={open_sess['mode']})")
         if st.button("Resume open session"):
-            st.session_state["session_id"] = open_sess["session_id"]
-            st.session_state["mode"] = open_sess["mode"]
-            st.rerun()
+            # Already resumed: the button click itself reran the page, skip a second pass.
+            if (st.session_state.get("session_id"), st.session_state.get("mode")) != (open_sess["session_id"], open_sess["mode"]):
+                st.session_state["session_id"] = open_sess["session_id"]
+                st.session_state["mode"] = open_sess["mode"]
+                st.rerun()
 
 with colB:
     # Don’t let invite-user end the session from their side
@@ -509,10 +620,10 @@ else:
             mark_invite_used(token)
             st.session_state[used_key] = True
     else:
-        respondent = st.radio("Who’s answering right now?", ["A", "B"], horizontal=True)
+        respondent = st.radio("Who’s answering right now?", DUO_RESPONDENTS, horizontal=True)
 
 rows_me = [r for r in rows_all if r["respondent"] == respondent]
-answered = set([r["question_id"] for r in rows_me])
+answered = frozenset(r["question_id"] for r in rows_me)
 
 # Branch queue (per respondent)
 bq_key = f"branch_queue_{sid}_{respondent}"
@@ -549,7 +660,7 @@ def _next_question_id():
             return qid
     return None
 
-primary_done = sum([1 for qid in PRIMARY_IDS if qid in answered])
+primary_done = len(PRIMARY_IDS_SET & answered)
 st.divider()
 st.progress(min(1.0, primary_done / max(1, len(PRIMARY_IDS))))
 
@@ -559,9 +670,11 @@ if mm_key not in st.session_state:
 
 if (not st.session_state[mm_key]) and primary_done >= 5:
     st.subheader("Mirror moment")
-    vals = next((r["answer_text"] for r in rows_me if r["question_id"] == "values_hierarchy"), "")
-    cost = next((r["answer_text"] for r in rows_me if r["question_id"] == "cost_tolerance"), "")
-    close = next((r["answer_text"] for r in rows_me if r["question_id"] == "closeness_numeric"), "")
+    # One sweep; keeps the first row seen per question, same as the old next() scans.
+    me_answers = latest_map(rows_me)
+    vals = me_answers.get("values_hierarchy", "")
+    cost = me_answers.get("cost_tolerance", "")
+    close = me_answers.get("closeness_numeric", "")
     cn = _extract_first_0_10(close)
 
     strength = "You’re naming what matters to you with some clarity." if len((vals or "").strip()) >= 40 else "You’re starting to identify what matters most."
@@ -572,19 +685,20 @@ if (not st.session_state[mm_key]) and primary_done >= 5:
     st.markdown(f"**Tension:** {tension}")
     st.markdown(f"**Cost:** {cost_line}")
 
-    ok = st.radio("Does this feel accurate enough to continue?", ["Yes", "Not quite"], horizontal=True)
+    ok = st.radio("Does this feel accurate enough to continue?", MIRROR_CHOICES, horizontal=True)
     if ok == "Not quite":
         correction = st.text_area("What should I understand differently? (Optional)", height=120)
         if st.button("Save correction and continue"):
             save_response(
-                response_id=str(uuid.uuid4()),
+                response_id=new_id(),
                 session_id=sid,
                 relationship_id=rid,
                 respondent=respondent,
                 question_id="mirror_correction",
                 answer_text=correction.strip(),
-                answer_json=json.dumps({"dimension": "meta"}),
+                answer_json=answer_json("meta"),
             )
+            _clear_answer_caches()
             st.session_state[mm_key] = True
             st.rerun()
     else:
@@ -597,8 +711,13 @@ next_qid = _next_question_id()
 if next_qid is None:
     st.success(f"{respondent} is done for this session.")
     if sess_mode == "duo":
-        done_a = all([qid in set([r["question_id"] for r in rows_all if r["respondent"] == "A"]) for qid in PRIMARY_IDS])
-        done_b = all([qid in set([r["question_id"] for r in rows_all if r["respondent"] == "B"]) for qid in PRIMARY_IDS])
+        answered_by = {"A": set(), "B": set()}
+        for r in rows_all:
+            ids = answered_by.get(r["respondent"])
+            if ids is not None:
+                ids.add(r["question_id"])
+        done_a = PRIMARY_IDS_SET.issubset(answered_by["A"])
+        done_b = PRIMARY_IDS_SET.issubset(answered_by["B"])
         if done_a and done_b:
             st.success("Both A and B are done. Go to **Report**.")
         else:
@@ -611,9 +730,9 @@ if next_qid is None:
     st.stop()
 
 q = QUESTION_BY_ID[next_qid]
-q_idx = next((i for i, qq in enumerate(QUESTIONS) if qq["id"] == next_qid), 0)
+q_idx = QID_INDEX.get(next_qid, 0)
 
-st.markdown(f"### Q{q_idx + 1} of {len(QUESTIONS)}")
+st.markdown(f"### Q{q_idx + 1} of {N_QUESTIONS}")
 st.write(_prompt_for(q, st.session_state.get("tone_profile", "Gentle & supportive")))
 answer = st.text_area("Answer", height=140, key=f"ans_{sid}_{respondent}_{q['id']}")
 
@@ -621,14 +740,15 @@ c1, c2 = st.columns([1, 1])
 with c1:
     if st.button("Save & next"):
         save_response(
-            response_id=str(uuid.uuid4()),
+            response_id=new_id(),
             session_id=sid,
             relationship_id=rid,
             respondent=respondent,
             question_id=q["id"],
             answer_text=answer.strip(),
-            answer_json=json.dumps({"dimension": q.get("dimension")}),
+            answer_json=answer_json(q.get("dimension")),
         )
+        _clear_answer_caches()
         _maybe_queue_branches(answer, q)
 
         if st.session_state[bq_key] and st.session_state[bq_key][0] == q["id"]:
@@ -639,14 +759,15 @@ with c1:
 with c2:
     if st.button("Skip"):
         save_response(
-            response_id=str(uuid.uuid4()),
+            response_id=new_id(),
             session_id=sid,
             relationship_id=rid,
             respondent=respondent,
             question_id=q["id"],
             answer_text="",
-            answer_json=json.dumps({"skipped": True, "dimension": q.get("dimension")}),
+            answer_json=answer_json(q.get("dimension"), skipped=True),
         )
+        _clear_answer_caches()
 
         if st.session_state[bq_key] and st.session_state[bq_key][0] == q["id"]:
             st.session_state[bq_key].pop(0)
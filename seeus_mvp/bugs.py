@@ -1,95 +1,283 @@
 # bugs.py
-import uuid
+import re
+import sqlite3
+from functools import lru_cache
 from typing import Optional, List, Any, Dict
-from db import conn, now_iso
+from db import conn, conn_for, new_id, now_iso, txn
+from ttl_cache import TTLCache
 
 BUG_STATUSES = ["New", "In Progress", "Fixed", "Verified", "Closed", "Rejected"]
 SEVERITIES = ["Low", "Medium", "High", "Critical"]
 
+# Lists above keep display order for the UI; these sets are for membership checks.
+_STATUS_SET = frozenset(BUG_STATUSES)
+_SEVERITY_SET = frozenset(SEVERITIES)
+
 VALID_TRANSITIONS = {
-    "New": ["In Progress", "Rejected"],
-    "In Progress": ["Fixed", "Rejected"],
-    "Fixed": ["Verified"],
-    "Verified": ["Closed"],
-    "Closed": [],
-    "Rejected": [],
+    k: frozenset(v)
+    for k, v in {
+        "New": ["In Progress", "Rejected"],
+        "In Progress": ["Fixed", "Rejected"],
+        "Fixed": ["Verified"],
+        "Verified": ["Closed"],
+        "Closed": [],
+        "Rejected": [],
+    }.items()
 }
 
 
-def is_valid_transition(current: str, nxt: str) -> bool:
-    return nxt == current or nxt in VALID_TRANSITIONS.get(current, [])
+_BUGS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bugs (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    reporter TEXT,
+    severity TEXT,            -- Low|Medium|High|Critical
+    status TEXT,              -- New|In Progress|Fixed|Verified|Closed|Rejected
+    assignee TEXT,
+    resolution_notes TEXT,
+    created_at TEXT,
+    updated_at TEXT
+);
+
+-- list_bugs filters on one of these and sorts by updated_at; the composite indexes
+-- serve both, so there is no temp b-tree sort. They supersede the single-column ones.
+DROP INDEX IF EXISTS idx_bugs_status;
+DROP INDEX IF EXISTS idx_bugs_severity;
+CREATE INDEX IF NOT EXISTS idx_bugs_status_updated ON bugs(status, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_bugs_sev_updated ON bugs(severity, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_bugs_assignee_updated ON bugs(assignee, updated_at DESC) WHERE assignee IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_bugs_updated ON bugs(updated_at);
+"""
+
+# Full-text index over the searchable columns, kept in sync by triggers. Optional:
+# builds of SQLite without FTS5 keep using the LIKE search in list_bugs.
+_BUGS_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS bugs_fts USING fts5(
+    title, description, reporter, assignee,
+    content='bugs', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS bugs_fts_ai AFTER INSERT ON bugs BEGIN
+    INSERT INTO bugs_fts(rowid, title, description, reporter, assignee)
+    VALUES (new.rowid, new.title, new.description, new.reporter, new.assignee);
+END;
+
+CREATE TRIGGER IF NOT EXISTS bugs_fts_ad AFTER DELETE ON bugs BEGIN
+    INSERT INTO bugs_fts(bugs_fts, rowid, title, description, reporter, assignee)
+    VALUES ('delete', old.rowid, old.title, old.description, old.reporter, old.assignee);
+END;
+
+CREATE TRIGGER IF NOT EXISTS bugs_fts_au AFTER UPDATE ON bugs BEGIN
+    INSERT INTO bugs_fts(bugs_fts, rowid, title, description, reporter, assignee)
+    VALUES ('delete', old.rowid, old.title, old.description, old.reporter, old.assignee);
+    INSERT INTO bugs_fts(rowid, title, description, reporter, assignee)
+    VALUES (new.rowid, new.title, new.description, new.reporter, new.assignee);
+END;
+"""
+
+_FTS_TOKEN_RE = re.compile(r"\w+")
+
+# bug_metrics backs the dashboard header; 45s staleness is fine and writes below invalidate it.
+_metrics_cache = TTLCache(ttl=45, maxsize=8)
+# get_bug by id, for detail views that re-read the same bug; update_bug drops the entry.
+_bug_cache = TTLCache(ttl=60, maxsize=256)
+
+# Explicit projection for bug reads: a fixed column order for the cached statements,
+# and rows stay plain sqlite3.Row (no per-row object construction).
+_BUG_COLUMNS = (
+    "id, title, description, reporter, severity, status, "
+    "assignee, resolution_notes, created_at, updated_at"
+)
+
+_bugs_table_ready = False
+_fts_enabled = False
+
+
+def create_bugs_table(c) -> bool:
+    # Returns whether the FTS index is available.
+    c.executescript(_BUGS_SCHEMA)
+    try:
+        c.executescript(_BUGS_FTS_SCHEMA)
+        # The index is keyed on bugs' implicit rowid, which VACUUM is free to renumber (the table
+        # has a TEXT primary key), and rows from before the FTS table existed aren't indexed at
+        # all. Rebuilding once per process (see init_bugs_table) puts both right; the table is small.
+        c.execute("INSERT INTO bugs_fts(bugs_fts) VALUES ('rebuild')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def init_bugs_table() -> None:
+    # Run the bug-tracker DDL once per process at startup, not on every bug operation.
+    global _bugs_table_ready, _fts_enabled
+    if _bugs_table_ready:
+        return
+    with conn() as c:
+        _fts_enabled = create_bugs_table(c)
+    _bugs_table_ready = True
 
 
-def create_bug(title: str, description: str, reporter: str, severity: str = "Medium") -> str:
-    bug_id = str(uuid.uuid4())
-    if severity not in SEVERITIES:
-        severity = "Medium"
+def _fts_query(search: str) -> Optional[str]:
+    # Quote every word and prefix-match it, so FTS operators in user input are inert.
+    # None means "use LIKE": FTS is off, the user typed their own %/_ wildcards, or
+    # there are no words to match on.
+    if not _fts_enabled or "%" in search or "_" in search:
+        return None
+    tokens = _FTS_TOKEN_RE.findall(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
 
-    with conn() as c:
-        c.execute(
+
+def _norm200(s: Optional[str]) -> str:
+    # Short text fields (title, reporter).
+    return (s or "").strip()[:200]
+
+
+def is_valid_transition(current: str, nxt: str) -> bool:
+    return nxt == current or nxt in VALID_TRANSITIONS.get(current, frozenset())
+
+
+def _allowed_previous(nxt: str) -> List[str]:
+    # Statuses a bug may be in for update_bug to move it to `nxt` (staying put included).
+    return [cur for cur in BUG_STATUSES if is_valid_transition(cur, nxt)]
+
+
+def create_bug(title: str, description: str, reporter: str, severity: str = "Medium", *, cur=None) -> str:
+    return create_bugs_bulk(
+        [{"title": title, "description": description, "reporter": reporter, "severity": severity}],
+        cur=cur,
+    )[0]
+
+
+def create_bugs_bulk(bugs: List[Dict[str, Any]], *, cur=None) -> List[str]:
+    # One executemany and one commit for the whole batch. Each dict takes create_bug's arguments.
+    ids: List[str] = []
+    rows = []
+    for b in bugs:
+        bug_id = new_id()
+        severity = b.get("severity") or "Medium"
+        if severity not in _SEVERITY_SET:
+            severity = "Medium"
+        ts = now_iso()
+        ids.append(bug_id)
+        rows.append((
+            bug_id,
+            _norm200(b.get("title")),
+            (b.get("description") or "").strip(),
+            _norm200(b.get("reporter") or "unknown"),
+            severity,
+            "New",
+            None,
+            None,
+            ts,
+            ts,
+        ))
+    if not rows:
+        return ids
+
+    # executemany under autocommit would commit per row; batch it in one transaction.
+    with (conn_for(cur) if cur is not None else txn()) as c:
+        c.executemany(
             """
             INSERT INTO bugs (
                 id, title, description, reporter, severity, status,
                 assignee, resolution_notes, created_at, updated_at
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                bug_id,
-                (title or "").strip()[:200],
-                (description or "").strip(),
-                (reporter or "unknown").strip()[:200],
-                severity,
-                "New",
-                None,
-                None,
-                now_iso(),
-                now_iso(),
-            ),
+            rows,
         )
-    return bug_id
+    _metrics_cache.invalidate()
+    return ids
 
 
-def list_bugs(
-    status: Optional[str] = None,
-    severity: Optional[str] = None,
-    assignee: Optional[str] = None,
-    search: Optional[str] = None,
-    limit: int = 200,
-):
+@lru_cache(maxsize=32)
+def _build_list_sql(has_status: bool, has_severity: bool, assignee_mode: str, search_mode: str) -> str:
+    # One SQL string per filter shape, so identical shapes hit the connection's statement cache.
+    # assignee_mode: "" | "eq" | "unassigned"; search_mode: "" | "fts" | "like".
     where = []
+    if has_status:
+        where.append("status=?")
+    if has_severity:
+        where.append("severity=?")
+    if assignee_mode == "unassigned":
+        where.append("(assignee IS NULL OR assignee='')")
+    elif assignee_mode == "eq":
+        where.append("assignee=?")
+    if search_mode == "fts":
+        where.append("rowid IN (SELECT rowid FROM bugs_fts WHERE bugs_fts MATCH ?)")
+    elif search_mode == "like":
+        where.append("(title LIKE ? OR description LIKE ? OR reporter LIKE ? OR assignee LIKE ?)")
+
+    where_sql = "WHERE " + " AND ".join(where) if where else ""
+    return f"SELECT {_BUG_COLUMNS} FROM bugs {where_sql} ORDER BY updated_at DESC LIMIT ?"
+
+
+def _list_bugs_query(
+    status: Optional[str],
+    severity: Optional[str],
+    assignee: Optional[str],
+    search: Optional[str],
+    limit: int,
+):
     params: List[Any] = []
 
-    if status and status != "All":
-        where.append("status=?")
+    has_status = bool(status and status != "All")
+    if has_status:
         params.append(status)
 
-    if severity and severity != "All":
-        where.append("severity=?")
+    has_severity = bool(severity and severity != "All")
+    if has_severity:
         params.append(severity)
 
+    assignee_mode = ""
     if assignee and assignee != "All":
         if assignee == "(Unassigned)":
-            where.append("(assignee IS NULL OR assignee='')")
+            assignee_mode = "unassigned"
         else:
-            where.append("assignee=?")
+            assignee_mode = "eq"
             params.append(assignee)
 
+    search_mode = ""
     if search:
-        s = f"%{search}%"
-        where.append("(title LIKE ? OR description LIKE ? OR reporter LIKE ? OR assignee LIKE ?)")
-        params.extend([s, s, s, s])
+        match = _fts_query(search)
+        if match:
+            search_mode = "fts"
+            params.append(match)
+        else:
+            search_mode = "like"
+            s = f"%{search}%"
+            params.extend([s, s, s, s])
 
-    where_sql = "WHERE " + " AND ".join(where) if where else ""
-    sql = f"SELECT * FROM bugs {where_sql} ORDER BY updated_at DESC LIMIT ?"
     params.append(limit)
+    return _build_list_sql(has_status, has_severity, assignee_mode, search_mode), tuple(params)
+
 
+def list_bugs(
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    assignee: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: int = 200,
+):
+    sql, params = _list_bugs_query(status, severity, assignee, search, limit)
     with conn() as c:
-        return c.execute(sql, tuple(params)).fetchall()
+        return c.execute(sql, params).fetchall()
 
 
-def get_bug(bug_id: str):
-    with conn() as c:
-        return c.execute("SELECT * FROM bugs WHERE id=?", (bug_id,)).fetchone()
+def get_bug(bug_id: str, *, cur=None):
+    # Inside a caller's txn() read through, so uncommitted state never lands in the cache.
+    if cur is None:
+        bug = _bug_cache.get(bug_id)
+        if bug is not None:
+            return bug
+    with conn_for(cur) as c:
+        bug = c.execute(f"SELECT {_BUG_COLUMNS} FROM bugs WHERE id=?", (bug_id,)).fetchone()
+    if bug is not None and cur is None:
+        _bug_cache.set(bug_id, bug)
+    return bug
 
 
 def update_bug(
@@ -98,55 +286,79 @@ def update_bug(
     status: Optional[str] = None,
     assignee: Optional[str] = None,
     resolution_notes: Optional[str] = None,
-):
-    bug = get_bug(bug_id)
-    if not bug:
-        raise ValueError("Bug not found")
+    cur=None,
+) -> bool:
+    # Returns False (and writes nothing) when every supplied value already matches,
+    # so callers can skip their st.rerun() on a no-op submit.
+    # The transition and no-op checks live in the UPDATE's WHERE clause, so the common
+    # path is one statement; the row is only read back to explain a zero rowcount.
+    if status and status not in _STATUS_SET:
+        raise ValueError("Invalid status")
+
+    updates: List[tuple] = []
+    if status is not None:
+        updates.append(("status", status))
+    if assignee is not None:
+        updates.append(("assignee", assignee.strip() or None))
+    if resolution_notes is not None:
+        updates.append(("resolution_notes", resolution_notes.strip() or None))
 
-    if status:
-        if status not in BUG_STATUSES:
-            raise ValueError("Invalid status")
-        if not is_valid_transition(bug["status"], status):
-            raise ValueError(f"Invalid transition: {bug['status']} → {status}")
+    if not updates:
+        if get_bug(bug_id, cur=cur) is None:
+            raise ValueError("Bug not found")
+        return False
 
-    fields = []
-    params: List[Any] = []
+    sets = [f"{col}=?" for col, _ in updates]
+    changed = [f"{col} IS NOT ?" for col, _ in updates]
+    values = [v for _, v in updates]
+    where = ["id=?"]
+    where_params: List[Any] = [bug_id]
 
-    if status is not None:
-        fields.append("status=?")
-        params.append(status)
+    if status:
+        allowed_prev = _allowed_previous(status)
+        where.append(f"status IN ({','.join('?' * len(allowed_prev))})")
+        where_params.extend(allowed_prev)
+    where.append(f"({' OR '.join(changed)})")
 
-    if assignee is not None:
-        fields.append("assignee=?")
-        params.append(assignee.strip() or None)
+    sql = f"UPDATE bugs SET {', '.join(sets)}, updated_at=? WHERE {' AND '.join(where)}"
+    with conn_for(cur) as c:
+        updated = c.execute(sql, (*values, now_iso(), *where_params, *values)).rowcount
 
-    if resolution_notes is not None:
-        fields.append("resolution_notes=?")
-        params.append(resolution_notes.strip() or None)
+    if updated:
+        _metrics_cache.invalidate()
+        _bug_cache.invalidate(bug_id)
+        return True
 
-    fields.append("updated_at=?")
-    params.append(now_iso())
+    bug = get_bug(bug_id, cur=cur)
+    if not bug:
+        raise ValueError("Bug not found")
+    if status and not is_valid_transition(bug["status"], status):
+        raise ValueError(f"Invalid transition: {bug['status']} → {status}")
+    return False
 
-    params.append(bug_id)
 
-    with conn() as c:
-        c.execute(f"UPDATE bugs SET {', '.join(fields)} WHERE id=?", tuple(params))
+def bug_metrics() -> Dict[str, Any]:
+    return _metrics_cache.get_or_set("bug_metrics", _load_bug_metrics)
 
 
-def bug_metrics() -> Dict[str, Any]:
+def _load_bug_metrics() -> Dict[str, Any]:
+    # One grouped scan; the per-status and per-severity totals are rolled up from it.
     with conn() as c:
-        by_status = {
-            r["status"]: r["n"]
-            for r in c.execute("SELECT status, COUNT(*) AS n FROM bugs GROUP BY status").fetchall()
-        }
-
-        by_severity = {
-            r["severity"]: r["n"]
-            for r in c.execute("SELECT severity, COUNT(*) AS n FROM bugs GROUP BY severity").fetchall()
-        }
-
-        open_critical = c.execute(
-            "SELECT COUNT(*) AS n FROM bugs WHERE severity='Critical' AND status NOT IN ('Closed','Rejected')"
-        ).fetchone()["n"]
+        rows = c.execute(
+            """
+            SELECT status, severity, COUNT(*) AS n,
+                   SUM(CASE WHEN severity='Critical' AND status NOT IN ('Closed','Rejected') THEN 1 ELSE 0 END) AS open_crit
+            FROM bugs
+            GROUP BY status, severity
+            """
+        ).fetchall()
+
+    by_status: Dict[Any, int] = {}
+    by_severity: Dict[Any, int] = {}
+    open_critical = 0
+    for status, severity, n, open_crit in rows:
+        by_status[status] = by_status.get(status, 0) + n
+        by_severity[severity] = by_severity.get(severity, 0) + n
+        open_critical += open_crit
 
     return {"by_status": by_status, "by_severity": by_severity, "open_critical": open_critical}
@@ -1,152 +1,570 @@
+import atexit
+import os
+import queue
 import sqlite3
+import threading
+import time
+import uuid
+import warnings
 from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+
+import fastjson
+from ttl_cache import TTLCache
 
 DB_PATH = Path("seeus.db")
 
+# Bump whenever init_db() gains new DDL or a migration; init_db() is a no-op once the
+# stored version has caught up.
+SCHEMA_VERSION = 7
+
+# Random bytes for new_id() are read in batches: one os.urandom call per 64 ids.
+_ID_BATCH = 64
+_id_lock = threading.Lock()
+_id_buf = b""
+_id_pos = 0
+
+
+def _reset_id_buffer():
+    # A forked child inherits the unread bytes and would hand out the parent's next ids
+    # (including invite tokens). Start it with an empty buffer and a fresh lock.
+    global _id_lock, _id_buf, _id_pos
+    _id_lock = threading.Lock()
+    _id_buf, _id_pos = b"", 0
+
+
+os.register_at_fork(after_in_child=_reset_id_buffer)
+
+
+# One process-wide connection. Streamlit runs each rerun on a fresh script thread, so a
+# per-thread connection would be reopened (cold page cache, empty statement cache) every
+# rerun. Access is serialised by an RLock, so helpers can nest conn() inside txn().
+_conn = None
+_conn_lock = threading.RLock()
+_txn_active = False
+_txn_thread = None
+
+# Read-only connections for pure SELECTs. Under WAL readers never block each other or the
+# writer, so dashboards on other sessions don't queue behind the shared connection's lock.
+_READ_POOL_SIZE = 4
+_READ_POOL = queue.Queue()
+_read_pool_lock = threading.Lock()
+_read_pool_ready = False
+
+# Lookups re-read on every rerun; the matching writes drop the cache. Keyed per relationship,
+# so bounded to roughly the number of relationships active at once.
+_relationship_cache = TTLCache(ttl=60, maxsize=512)
+_latest_report_cache = TTLCache(ttl=30, maxsize=512)
+_latest_checkin_cache = TTLCache(ttl=30, maxsize=1024)
+
+# Hot-path SQL, defined once; the text is also the key for the connection's statement cache.
+_Q_SAVE_RESPONSE = """
+INSERT INTO responses(response_id, session_id, relationship_id, respondent, question_id, answer_text, answer_json, created_at)
+VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_Q_LAST_ANSWERS_BY_RESP = """
+SELECT question_id, answer_text, created_at
+FROM responses
+WHERE relationship_id=? AND respondent=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+_Q_LAST_ANSWERS = """
+SELECT question_id, answer_text, created_at
+FROM responses
+WHERE relationship_id=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+_Q_ANSWER_HISTORY = """
+SELECT answer_text, created_at
+FROM responses
+WHERE relationship_id=? AND respondent=? AND question_id=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+# Growth timeline: walks idx_growth_resp_cover / idx_growth_cover in created_at order and stops
+# at the limit; the texts come from the table.
+_Q_GROWTH_TIMELINE_BY_RESP = """
+SELECT checkin_id, respondent, month_key, created_at, repair_choice, pattern_text, shift_text,
+       clarity_score, cost_score, agency_score
+FROM growth_checkins
+WHERE relationship_id=? AND respondent=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+_Q_GROWTH_TIMELINE = """
+SELECT checkin_id, respondent, month_key, created_at, repair_choice, pattern_text, shift_text,
+       clarity_score, cost_score, agency_score
+FROM growth_checkins
+WHERE relationship_id=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+# Latest check-in for the growth dashboard: reads only columns idx_growth_cover (all
+# respondents) and idx_growth_resp_cover (one respondent) hold, so SQLite answers it from the
+# index without touching the table.
+_Q_LATEST_CHECKIN_BY_RESP = """
+SELECT month_key, created_at, repair_choice, clarity_score, cost_score, agency_score
+FROM growth_checkins
+WHERE relationship_id=? AND respondent=?
+ORDER BY created_at DESC
+LIMIT 1
+"""
+_Q_LATEST_CHECKIN = """
+SELECT month_key, created_at, repair_choice, clarity_score, cost_score, agency_score
+FROM growth_checkins
+WHERE relationship_id=?
+ORDER BY created_at DESC
+LIMIT 1
+"""
+_Q_LATEST_REPORT_BY_TYPE = """
+SELECT * FROM reports
+WHERE relationship_id=? AND report_type=?
+ORDER BY created_at DESC
+LIMIT 1
+"""
+_Q_LATEST_REPORT = """
+SELECT * FROM reports
+WHERE relationship_id=?
+ORDER BY created_at DESC
+LIMIT 1
+"""
+_Q_GROWTH_REFLECTIONS_BY_RESP = """
+SELECT * FROM growth_reflections
+WHERE relationship_id=? AND respondent=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+_Q_GROWTH_REFLECTIONS = """
+SELECT * FROM growth_reflections
+WHERE relationship_id=?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+
+
+def _open():
+    # isolation_level=None: autocommit. Single statements commit on their own; multi-statement
+    # work goes through txn(), which issues its own BEGIN IMMEDIATE / COMMIT.
+    c = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256, isolation_level=None)
+    c.row_factory = sqlite3.Row
+    # synchronous=NORMAL skips the fsync on every commit and is still crash-safe under WAL.
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA busy_timeout=30000")       # wait up to 30s on another writer instead of failing
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA mmap_size=268435456")      # 256 MB memory-mapped reads
+    c.execute("PRAGMA wal_autocheckpoint=1000")  # pages
+    c.execute("PRAGMA cache_size=-64000")        # ~64 MB page cache (negative = KiB)
+    # Keep planner statistics in step with the data. analysis_limit bounds the work to a sample
+    # of each index. SQLite >= 3.46 re-analyzes only tables whose size has drifted (0x10000:
+    # check every table, not just ones this connection has queried); older versions can't tell
+    # at open, so they refresh the sampled stats once per process.
+    c.execute("PRAGMA analysis_limit=400")
+    if sqlite3.sqlite_version_info >= (3, 46, 0):
+        c.execute("PRAGMA optimize=0x10002")
+    else:
+        c.execute("ANALYZE")
+    return c
+
+
+def _close_writer(c):
+    try:
+        c.execute("PRAGMA optimize")
+    finally:
+        c.close()
+
+
+def _shared_conn():
+    global _conn
+    if _conn is None:
+        with _conn_lock:
+            if _conn is None:
+                _conn = _open()
+                atexit.register(_close_writer, _conn)
+    return _conn
+
 
 @contextmanager
 def conn():
-    c = sqlite3.connect(DB_PATH)
+    with _conn_lock:
+        c = _shared_conn()
+        try:
+            yield c
+        finally:
+            # Autocommit leaves nothing open unless a caller issued BEGIN by hand
+            # (inside txn() the transaction belongs to txn()).
+            if c.in_transaction and not _txn_active:
+                c.execute("ROLLBACK")
+
+
+@contextmanager
+def txn():
+    # One explicit write transaction; pass the connection as `cur=` to helpers that accept it.
+    # A txn() opened inside another one joins it.
+    global _txn_active, _txn_thread
+    with _conn_lock:
+        c = _shared_conn()
+        if _txn_active:
+            yield c
+            return
+        c.execute("BEGIN IMMEDIATE")
+        _txn_active = True
+        _txn_thread = threading.get_ident()
+        try:
+            yield c
+            c.execute("COMMIT")
+        except BaseException:
+            c.execute("ROLLBACK")
+            raise
+        finally:
+            _txn_active = False
+            _txn_thread = None
+
+
+def _open_reader():
+    uri = f"{DB_PATH.resolve().as_uri()}?mode=ro"
+    c = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=128, isolation_level=None)
     c.row_factory = sqlite3.Row
+    c.execute("PRAGMA query_only=1")
+    c.execute("PRAGMA busy_timeout=30000")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA mmap_size=268435456")
+    c.execute("PRAGMA cache_size=-16000")
+    return c
+
+
+def _fill_read_pool():
+    global _read_pool_ready
+    with _read_pool_lock:
+        if _read_pool_ready:
+            return True
+        if not DB_PATH.exists():
+            return False
+        for _ in range(_READ_POOL_SIZE):
+            r = _open_reader()
+            atexit.register(r.close)
+            _READ_POOL.put(r)
+        _read_pool_ready = True
+        return True
+
+
+@contextmanager
+def rconn():
+    # Pooled read-only connection. Falls back to conn() inside this thread's txn() (a reader
+    # wouldn't see its uncommitted rows) and before init_db() has created the file.
+    if (_txn_active and _txn_thread == threading.get_ident()) or not (_read_pool_ready or _fill_read_pool()):
+        with conn() as c:
+            yield c
+        return
+    c = _READ_POOL.get()
     try:
         yield c
-        c.commit()
     finally:
-        c.close()
+        if c.in_transaction:
+            c.execute("ROLLBACK")
+        _READ_POOL.put(c)
+
+
+@contextmanager
+def conn_for(cur=None):
+    # Join the caller's txn() when one is passed, otherwise behave like conn().
+    if cur is not None:
+        yield cur
+        return
+    with conn() as c:
+        yield c
+
+
+def new_id() -> str:
+    # Same format as str(uuid.uuid4()), sliced from the batched random buffer.
+    global _id_buf, _id_pos
+    with _id_lock:
+        if _id_pos >= len(_id_buf):
+            _id_buf = os.urandom(16 * _ID_BATCH)
+            _id_pos = 0
+        raw = _id_buf[_id_pos:_id_pos + 16]
+        _id_pos += 16
+    return str(uuid.UUID(bytes=raw, version=4))
+
+
+# (epoch second, formatted stamp) of the last now_iso() call. Replaced as one tuple, so a
+# reader on another thread never sees a second paired with another second's string.
+_ts_cache = (-1, "")
 
 
 def now_iso():
-    return datetime.utcnow().isoformat(timespec="seconds")
+    # Same "YYYY-MM-DDTHH:MM:SS" (UTC, no offset) as datetime.utcnow().isoformat(timespec="seconds"),
+    # formatted straight from gmtime; stored timestamps are compared as strings. Writes landing in
+    # the same second reuse the string.
+    global _ts_cache
+    t = int(time.time())
+    cached = _ts_cache
+    if cached[0] == t:
+        return cached[1]
+    tm = time.gmtime(t)
+    stamp = f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}"
+    _ts_cache = (t, stamp)
+    return stamp
+
+
+def _has_column(c, table, column) -> bool:
+    # Asks SQLite for the one column instead of listing them all in Python.
+    return c.execute(
+        "SELECT 1 FROM pragma_table_info(?) WHERE name=? LIMIT 1", (table, column)
+    ).fetchone() is not None
+
+
+# Narrow tables only ever looked up by their UUID key. As WITHOUT ROWID tables the rows live
+# in one B-tree keyed on that UUID, instead of a rowid table plus a separate PK index. The
+# wide tables (responses, reports, growth_*) keep their rowid, as do bugs (FTS content_rowid).
+_WITHOUT_ROWID_TABLES = ("users", "relationships", "sessions", "invites")
+
+
+def _table_sql(c, table):
+    row = c.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    return row[0] if row else None
+
+
+def _is_without_rowid(c, table) -> bool:
+    sql = _table_sql(c, table)
+    return sql is None or sql.rstrip().upper().endswith("WITHOUT ROWID")
+
+
+def _rebuild_without_rowid(c, table) -> None:
+    # Copy into a WITHOUT ROWID twin of the current definition (including columns added by
+    # earlier migrations), swap it in, then recreate the table's indexes.
+    sql = _table_sql(c, table)
+    pk = c.execute("SELECT name FROM pragma_table_info(?) WHERE pk=1", (table,)).fetchone()[0]
+    indexes = [
+        r[0] for r in c.execute(
+            "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL", (table,)
+        )
+    ]
+    tmp = f"{table}__rebuild"
+    create_tmp = sql.replace(table, tmp, 1).rstrip() + " WITHOUT ROWID"
+    with txn() as t:
+        t.execute(f"DROP TABLE IF EXISTS {tmp}")
+        t.execute(create_tmp)
+        # WITHOUT ROWID keys can't be NULL; such rows were unreachable by key anyway.
+        t.execute(f"INSERT INTO {tmp} SELECT * FROM {table} WHERE {pk} IS NOT NULL")
+        t.execute(f"DROP TABLE {table}")
+        t.execute(f"ALTER TABLE {tmp} RENAME TO {table}")
+        for idx in indexes:
+            t.execute(idx)
+
+
+def _schema_version(c):
+    c.execute("CREATE TABLE IF NOT EXISTS schema_meta (key TEXT PRIMARY KEY, value TEXT)")
+    row = c.execute("SELECT value FROM schema_meta WHERE key='version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+# Hot queries that must stay index lookups. Checked by _check_index_usage() under SEEUS_DEBUG.
+_INDEXED_QUERIES = (
+    _Q_LAST_ANSWERS_BY_RESP,
+    _Q_LAST_ANSWERS,
+    _Q_ANSWER_HISTORY,
+    _Q_LATEST_REPORT_BY_TYPE,
+    _Q_LATEST_REPORT,
+    _Q_GROWTH_TIMELINE_BY_RESP,
+    _Q_GROWTH_TIMELINE,
+    _Q_LATEST_CHECKIN_BY_RESP,
+    _Q_LATEST_CHECKIN,
+    _Q_GROWTH_REFLECTIONS_BY_RESP,
+    _Q_GROWTH_REFLECTIONS,
+)
+_INDEXED_TABLES = ("responses", "reports", "growth_checkins", "growth_reflections")
+
+
+def _check_index_usage() -> None:
+    # Dev check: a hot query whose plan falls back to a full scan of one of these tables means
+    # an index was dropped or the query stopped matching it. Plans depend on the local data's
+    # statistics, so this warns rather than stopping the app. Uses its own uncached connection:
+    # a cached EXPLAIN statement keeps reporting the plan from when it was first prepared.
+    c = sqlite3.connect(DB_PATH, cached_statements=0)
+    try:
+        for sql in _INDEXED_QUERIES:
+            params = (None,) * sql.count("?")
+            for row in c.execute("EXPLAIN QUERY PLAN " + sql, params):
+                detail = row[-1]
+                if detail.startswith("SCAN ") and detail.split()[1] in _INDEXED_TABLES:
+                    warnings.warn(f"Query no longer uses an index ({detail}):\n{sql.strip()}", stacklevel=2)
+    finally:
+        c.close()
 
 
 def init_db():
     with conn() as c:
-        c.executescript(
-            '''
-            PRAGMA journal_mode=WAL;
-
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                display_name TEXT,
-                created_at TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS relationships (
-                relationship_id TEXT PRIMARY KEY,
-                user_a_id TEXT,
-                user_b_id TEXT,
-                label TEXT,
-                created_at TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                relationship_id TEXT,
-                mode TEXT,
-                started_at TEXT,
-                ended_at TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS responses (
-                response_id TEXT PRIMARY KEY,
-                session_id TEXT,
-                relationship_id TEXT,
-                respondent TEXT,          -- A|B|solo
-                question_id TEXT,
-                answer_text TEXT,
-                answer_json TEXT,
-                created_at TEXT
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_responses_rel ON responses(relationship_id);
-            CREATE INDEX IF NOT EXISTS idx_responses_sess ON responses(session_id);
-            CREATE INDEX IF NOT EXISTS idx_responses_q ON responses(question_id);
-            CREATE INDEX IF NOT EXISTS idx_responses_rel_resp_q ON responses(relationship_id, respondent, question_id);
-
-            -- Stored reports (heuristic/llm/deep) for consistency across sessions
-            CREATE TABLE IF NOT EXISTS reports (
-                report_id TEXT PRIMARY KEY,
-                relationship_id TEXT,
-                report_type TEXT,         -- heuristic|llm|deep
-                created_at TEXT,
-                content_json TEXT
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_reports_rel ON reports(relationship_id);
-
-            -- Growth check-ins (monthly cadence)
-            CREATE TABLE IF NOT EXISTS growth_checkins (
-                checkin_id TEXT PRIMARY KEY,
-                relationship_id TEXT,
-                mode TEXT,                -- solo|duo
-                respondent TEXT,          -- solo|A|B
-                created_at TEXT,
-                month_key TEXT,           -- YYYY-MM
-                pattern_text TEXT,
-                cost_text TEXT,
-                repair_choice TEXT,
-                agency_choice TEXT,
-                shift_text TEXT,
-                metrics_json TEXT         -- {clarity:0-5,cost:0-5,agency:0-5}
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_growth_rel ON growth_checkins(relationship_id);
-            CREATE INDEX IF NOT EXISTS idx_growth_rel_month ON growth_checkins(relationship_id, month_key);
-
-            -- Optional free-form monthly reflection prompt responses
-            CREATE TABLE IF NOT EXISTS growth_reflections (
-                reflection_id TEXT PRIMARY KEY,
-                relationship_id TEXT,
-                respondent TEXT,
-                created_at TEXT,
-                month_key TEXT,
-                prompt_text TEXT,
-                response_text TEXT
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_reflect_rel_month ON growth_reflections(relationship_id, month_key);
-
-            CREATE TABLE IF NOT EXISTS invites (
-                token TEXT PRIMARY KEY,
-                relationship_id TEXT,
-                respondent TEXT,          -- A|B|solo
-                created_at TEXT,
-                used_at TEXT
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_invites_rel ON invites(relationship_id);
-
-            -- --- Bug Tracker ---
-            CREATE TABLE IF NOT EXISTS bugs (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                description TEXT NOT NULL,
-                reporter TEXT,
-                severity TEXT,            -- Low|Medium|High|Critical
-                status TEXT,              -- New|In Progress|Fixed|Verified|Closed|Rejected
-                assignee TEXT,
-                resolution_notes TEXT,
-                created_at TEXT,
-                updated_at TEXT
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_bugs_status ON bugs(status);
-            CREATE INDEX IF NOT EXISTS idx_bugs_severity ON bugs(severity);
-            CREATE INDEX IF NOT EXISTS idx_bugs_updated ON bugs(updated_at);
-            '''
-        )
+        # Already at the current schema: skip the DDL script and column checks entirely.
+        if _schema_version(c) < SCHEMA_VERSION:
+            _upgrade_schema(c)
+    if os.getenv("SEEUS_DEBUG"):
+        _check_index_usage()
+
+
+def _upgrade_schema(c):
+    c.executescript(
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            display_name TEXT,
+            created_at TEXT
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS relationships (
+            relationship_id TEXT PRIMARY KEY,
+            user_a_id TEXT,
+            user_b_id TEXT,
+            label TEXT,
+            created_at TEXT
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            relationship_id TEXT,
+            mode TEXT,
+            started_at TEXT,
+            ended_at TEXT
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS responses (
+            response_id TEXT PRIMARY KEY,
+            session_id TEXT,
+            relationship_id TEXT,
+            respondent TEXT,          -- A|B|solo
+            question_id TEXT,
+            answer_text TEXT,
+            answer_json TEXT,
+            created_at TEXT
+        );
+
+        DROP INDEX IF EXISTS idx_responses_rel;  -- prefix of idx_responses_rel_created
+        -- Matches "WHERE relationship_id=? ORDER BY created_at DESC LIMIT ?" (both respondents).
+        CREATE INDEX IF NOT EXISTS idx_responses_rel_created ON responses(relationship_id, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_responses_sess ON responses(session_id);
+        CREATE INDEX IF NOT EXISTS idx_responses_q ON responses(question_id);
+        CREATE INDEX IF NOT EXISTS idx_responses_rel_resp_q ON responses(relationship_id, respondent, question_id);
+        -- Matches "WHERE relationship_id=? AND respondent=? ORDER BY created_at DESC LIMIT ?".
+        CREATE INDEX IF NOT EXISTS idx_responses_rel_resp_created ON responses(relationship_id, respondent, created_at DESC);
+
+        -- Stored reports (heuristic/llm/deep) for consistency across sessions
+        CREATE TABLE IF NOT EXISTS reports (
+            report_id TEXT PRIMARY KEY,
+            relationship_id TEXT,
+            report_type TEXT,         -- heuristic|llm|deep
+            created_at TEXT,
+            content_json TEXT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_reports_rel ON reports(relationship_id);
+
+        -- Growth check-ins (monthly cadence)
+        CREATE TABLE IF NOT EXISTS growth_checkins (
+            checkin_id TEXT PRIMARY KEY,
+            relationship_id TEXT,
+            mode TEXT,                -- solo|duo
+            respondent TEXT,          -- solo|A|B
+            created_at TEXT,
+            month_key TEXT,           -- YYYY-MM
+            pattern_text TEXT,
+            cost_text TEXT,
+            repair_choice TEXT,
+            agency_choice TEXT,
+            shift_text TEXT,
+            metrics_json TEXT,        -- {clarity:0-5,cost:0-5,agency:0-5}
+            clarity_score INTEGER,    -- metrics_json's values as plain columns
+            cost_score INTEGER,
+            agency_score INTEGER
+        );
+
+        DROP INDEX IF EXISTS idx_growth_rel;  -- prefix of idx_growth_cover
+        CREATE INDEX IF NOT EXISTS idx_growth_rel_month ON growth_checkins(relationship_id, month_key);
+        DROP INDEX IF EXISTS idx_growth_rel_resp_created;  -- prefix of idx_growth_resp_cover
+
+        -- Optional free-form monthly reflection prompt responses
+        CREATE TABLE IF NOT EXISTS growth_reflections (
+            reflection_id TEXT PRIMARY KEY,
+            relationship_id TEXT,
+            respondent TEXT,
+            created_at TEXT,
+            month_key TEXT,
+            prompt_text TEXT,
+            response_text TEXT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_reflect_rel_month ON growth_reflections(relationship_id, month_key);
+        CREATE INDEX IF NOT EXISTS idx_reflect_rel_resp_created ON growth_reflections(relationship_id, respondent, created_at DESC);
+
+        CREATE TABLE IF NOT EXISTS invites (
+            token TEXT PRIMARY KEY,
+            relationship_id TEXT,
+            respondent TEXT,          -- A|B|solo
+            created_at TEXT,
+            used_at TEXT
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_invites_rel ON invites(relationship_id);
+        '''
+    )
+
+    # lightweight migrations
+    if not _has_column(c, "sessions", "tone_profile"):
+        c.execute("ALTER TABLE sessions ADD COLUMN tone_profile TEXT")
+
+    # ✅ Add relationships.is_archived (soft delete) if missing
+    if not _has_column(c, "relationships", "is_archived"):
+        c.execute("ALTER TABLE relationships ADD COLUMN is_archived INTEGER DEFAULT 0")
+
+    # Databases created before the narrow tables were WITHOUT ROWID: rebuild them in place.
+    for table in _WITHOUT_ROWID_TABLES:
+        if not _is_without_rowid(c, table):
+            _rebuild_without_rowid(c, table)
+
+    # growth_checkins metric columns, backfilled from the JSON blob. One transaction, so a crash
+    # can't leave some of the columns added (and never backfilled) behind the clarity_score check.
+    if not _has_column(c, "growth_checkins", "clarity_score"):
+        with txn() as t:
+            for col in ("clarity_score", "cost_score", "agency_score"):
+                t.execute(f"ALTER TABLE growth_checkins ADD COLUMN {col} INTEGER")
+            t.execute(
+                """
+                UPDATE growth_checkins SET
+                    clarity_score = json_extract(metrics_json, '$.clarity'),
+                    cost_score = json_extract(metrics_json, '$.cost'),
+                    agency_score = json_extract(metrics_json, '$.agency')
+                WHERE json_valid(metrics_json)
+                """
+            )
 
-        # lightweight migrations
-        cols_sessions = [r["name"] for r in c.execute("PRAGMA table_info(sessions)").fetchall()]
-        if "tone_profile" not in cols_sessions:
-            c.execute("ALTER TABLE sessions ADD COLUMN tone_profile TEXT")
+    # Created here rather than in the script above: older databases only gain the score
+    # columns in the migration just before.
+    c.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_growth_cover ON growth_checkins(
+            relationship_id, created_at DESC, month_key, repair_choice,
+            clarity_score, cost_score, agency_score
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_growth_resp_cover ON growth_checkins(
+            relationship_id, respondent, created_at DESC, month_key, repair_choice,
+            clarity_score, cost_score, agency_score
+        )
+        """
+    )
+    # Indexes created above have no statistics yet; if other tables do, the planner would weigh
+    # the new ones against stale numbers. Refresh once here, PRAGMA optimize keeps them current.
+    if c.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'").fetchone():
+        c.execute("ANALYZE")
 
-        # ✅ Add relationships.is_archived (soft delete) if missing
-        cols_rels = [r["name"] for r in c.execute("PRAGMA table_info(relationships)").fetchall()]
-        if "is_archived" not in cols_rels:
-            c.execute("ALTER TABLE relationships ADD COLUMN is_archived INTEGER DEFAULT 0")
+    c.execute(
+        "INSERT OR REPLACE INTO schema_meta(key, value) VALUES('version', ?)",
+        (str(SCHEMA_VERSION),),
+    )
 
 
 def upsert_user(user_id, display_name):
@@ -170,11 +588,12 @@ def create_relationship(relationship_id, user_a_id, user_b_id, label):
             """,
             (relationship_id, user_a_id, user_b_id, label, now_iso()),
         )
+    _relationship_cache.invalidate(relationship_id)
 
 
 # ✅ list_relationships now supports include_archived
 def list_relationships(include_archived: bool = False):
-    with conn() as c:
+    with rconn() as c:
         if include_archived:
             return c.execute(
                 "SELECT * FROM relationships ORDER BY created_at DESC"
@@ -185,7 +604,11 @@ def list_relationships(include_archived: bool = False):
 
 
 def get_relationship(relationship_id):
-    with conn() as c:
+    return _relationship_cache.get_or_set(relationship_id, lambda: _load_relationship(relationship_id))
+
+
+def _load_relationship(relationship_id):
+    with rconn() as c:
         return c.execute(
             "SELECT * FROM relationships WHERE relationship_id=?",
             (relationship_id,),
@@ -199,6 +622,7 @@ def archive_relationship(relationship_id: str):
             "UPDATE relationships SET is_archived=1 WHERE relationship_id=?",
             (relationship_id,),
         )
+    _relationship_cache.invalidate(relationship_id)
 
 
 def restore_relationship(relationship_id: str):
@@ -207,6 +631,7 @@ def restore_relationship(relationship_id: str):
             "UPDATE relationships SET is_archived=0 WHERE relationship_id=?",
             (relationship_id,),
         )
+    _relationship_cache.invalidate(relationship_id)
 
 
 def create_session(session_id, relationship_id, mode, tone_profile=None):
@@ -221,7 +646,7 @@ def create_session(session_id, relationship_id, mode, tone_profile=None):
 
 
 def get_open_session(relationship_id):
-    with conn() as c:
+    with rconn() as c:
         return c.execute(
             """
             SELECT * FROM sessions
@@ -238,19 +663,16 @@ def end_session(session_id):
         c.execute("UPDATE sessions SET ended_at=? WHERE session_id=?", (now_iso(), session_id))
 
 
-def save_response(response_id, session_id, relationship_id, respondent, question_id, answer_text, answer_json=None):
-    with conn() as c:
+def save_response(response_id, session_id, relationship_id, respondent, question_id, answer_text, answer_json=None, *, cur=None):
+    with conn_for(cur) as c:
         c.execute(
-            """
-            INSERT INTO responses(response_id, session_id, relationship_id, respondent, question_id, answer_text, answer_json, created_at)
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            _Q_SAVE_RESPONSE,
             (response_id, session_id, relationship_id, respondent, question_id, answer_text, answer_json, now_iso()),
         )
 
 
 def get_answers_for_session(session_id):
-    with conn() as c:
+    with rconn() as c:
         return c.execute(
             """
             SELECT * FROM responses
@@ -262,44 +684,99 @@ def get_answers_for_session(session_id):
 
 
 def get_last_answers(relationship_id, respondent=None, limit=50):
-    with conn() as c:
+    with rconn() as c:
         if respondent:
             return c.execute(
-                """
-                SELECT question_id, answer_text, created_at
-                FROM responses
-                WHERE relationship_id=? AND respondent=?
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
+                _Q_LAST_ANSWERS_BY_RESP,
                 (relationship_id, respondent, limit),
             ).fetchall()
         return c.execute(
+            _Q_LAST_ANSWERS,
+            (relationship_id, limit),
+        ).fetchall()
+
+
+def get_last_answers_multi(relationship_id, respondents=("A", "B", "solo"), limit_per=6):
+    # get_last_answers for several respondents in one query: {respondent: rows newest-first}.
+    respondents = list(respondents)
+    if not respondents:
+        return {}
+    with rconn() as c:
+        rows = c.execute(
+            f"""
+            SELECT respondent, question_id, answer_text, created_at FROM (
+                SELECT respondent, question_id, answer_text, created_at,
+                       ROW_NUMBER() OVER (PARTITION BY respondent ORDER BY created_at DESC, rowid DESC) AS rn
+                FROM responses
+                WHERE relationship_id=? AND respondent IN ({",".join("?" * len(respondents))})
+            )
+            WHERE rn<=?
+            ORDER BY respondent, rn
+            """,
+            (relationship_id, *respondents, limit_per),
+        ).fetchall()
+    out = {r: [] for r in respondents}
+    for r in rows:
+        out[r["respondent"]].append(r)
+    return out
+
+
+def get_latest_answers_by_respondent(relationship_id):
+    # Latest answer per question for every respondent in one round-trip: {respondent: {qid: text}}.
+    with rconn() as c:
+        rows = c.execute(
             """
-            SELECT question_id, answer_text, created_at
-            FROM responses
-            WHERE relationship_id=?
-            ORDER BY created_at DESC
-            LIMIT ?
+            SELECT respondent, question_id, answer_text FROM (
+                SELECT respondent, question_id, answer_text,
+                       ROW_NUMBER() OVER (PARTITION BY respondent, question_id ORDER BY created_at DESC, rowid DESC) AS rn
+                FROM responses
+                WHERE relationship_id=?
+            )
+            WHERE rn=1
             """,
-            (relationship_id, limit),
+            (relationship_id,),
         ).fetchall()
+    out = {}
+    for r in rows:
+        out.setdefault(r["respondent"], {})[r["question_id"]] = r["answer_text"]
+    return out
 
 
 def get_answer_history(relationship_id, respondent, question_id, limit=5):
-    with conn() as c:
+    with rconn() as c:
         return c.execute(
-            """
-            SELECT answer_text, created_at
-            FROM responses
-            WHERE relationship_id=? AND respondent=? AND question_id=?
-            ORDER BY created_at DESC
-            LIMIT ?
-            """,
+            _Q_ANSWER_HISTORY,
             (relationship_id, respondent, question_id, limit),
         ).fetchall()
 
 
+def get_histories_bulk(relationship_id, respondents, question_ids, limit=3):
+    # get_answer_history for many (respondent, question) pairs in one query: {(respondent, qid): rows newest-first}.
+    respondents, question_ids = list(respondents), list(question_ids)
+    if not respondents or not question_ids:
+        return {}
+    with rconn() as c:
+        rows = c.execute(
+            f"""
+            SELECT respondent, question_id, answer_text, created_at FROM (
+                SELECT respondent, question_id, answer_text, created_at,
+                       ROW_NUMBER() OVER (PARTITION BY respondent, question_id ORDER BY created_at DESC, rowid DESC) AS rn
+                FROM responses
+                WHERE relationship_id=?
+                  AND respondent IN ({",".join("?" * len(respondents))})
+                  AND question_id IN ({",".join("?" * len(question_ids))})
+            )
+            WHERE rn<=?
+            ORDER BY respondent, question_id, rn
+            """,
+            (relationship_id, *respondents, *question_ids, limit),
+        ).fetchall()
+    out = {}
+    for r in rows:
+        out.setdefault((r["respondent"], r["question_id"]), []).append(r)
+    return out
+
+
 # --- Invites ---
 def create_invite(token, relationship_id, respondent):
     with conn() as c:
@@ -314,7 +791,7 @@ def create_invite(token, relationship_id, respondent):
 
 
 def get_invite(token):
-    with conn() as c:
+    with rconn() as c:
         return c.execute("SELECT * FROM invites WHERE token=?", (token,)).fetchone()
 
 
@@ -333,80 +810,76 @@ def save_report(report_id, relationship_id, report_type, content_json):
             """,
             (report_id, relationship_id, report_type, now_iso(), content_json),
         )
+    _latest_report_cache.invalidate()
 
 
 def get_latest_report(relationship_id, report_type=None):
-    with conn() as c:
+    return _latest_report_cache.get_or_set(
+        (relationship_id, report_type), lambda: _load_latest_report(relationship_id, report_type)
+    )
+
+
+def _load_latest_report(relationship_id, report_type):
+    with rconn() as c:
         if report_type:
-            return c.execute(
-                """
-                SELECT * FROM reports
-                WHERE relationship_id=? AND report_type=?
-                ORDER BY created_at DESC
-                LIMIT 1
-                """,
-                (relationship_id, report_type),
-            ).fetchone()
-        return c.execute(
-            """
-            SELECT * FROM reports
-            WHERE relationship_id=?
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (relationship_id,),
-        ).fetchone()
+            return c.execute(_Q_LATEST_REPORT_BY_TYPE, (relationship_id, report_type)).fetchone()
+        return c.execute(_Q_LATEST_REPORT, (relationship_id,)).fetchone()
 
 
 # --- Growth ---
-def save_growth_checkin(checkin_id, relationship_id, mode, respondent, month_key, pattern_text, cost_text, repair_choice, agency_choice, shift_text, metrics_json):
-    with conn() as c:
+def _metric_scores(metrics_json):
+    # (clarity, cost, agency) for the score columns; metrics_json stays the source of truth.
+    try:
+        m = fastjson.loads(metrics_json or "{}")
+    except ValueError:
+        return None, None, None
+    if not isinstance(m, dict):
+        return None, None, None
+    return m.get("clarity"), m.get("cost"), m.get("agency")
+
+
+def save_growth_checkin(checkin_id, relationship_id, mode, respondent, month_key, pattern_text, cost_text, repair_choice, agency_choice, shift_text, metrics_json, *, cur=None):
+    with conn_for(cur) as c:
         c.execute(
             """
             INSERT INTO growth_checkins(
                 checkin_id, relationship_id, mode, respondent, created_at, month_key,
-                pattern_text, cost_text, repair_choice, agency_choice, shift_text, metrics_json
-            ) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                pattern_text, cost_text, repair_choice, agency_choice, shift_text, metrics_json,
+                clarity_score, cost_score, agency_score
+            ) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 checkin_id, relationship_id, mode, respondent, now_iso(), month_key,
-                pattern_text, cost_text, repair_choice, agency_choice, shift_text, metrics_json
+                pattern_text, cost_text, repair_choice, agency_choice, shift_text, metrics_json,
+                *_metric_scores(metrics_json),
             )
         )
+    _latest_checkin_cache.invalidate()
 
 
-def list_growth_checkins(relationship_id, respondent=None, limit=50):
-    with conn() as c:
+def list_growth_timeline(relationship_id, respondent=None, limit=20):
+    # Newest first, in _Q_GROWTH_TIMELINE's column order.
+    with rconn() as c:
         if respondent:
-            rows = c.execute(
-                """
-                SELECT * FROM growth_checkins
-                WHERE relationship_id=? AND respondent=?
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
-                (relationship_id, respondent, limit),
-            ).fetchall()
-        else:
-            rows = c.execute(
-                """
-                SELECT * FROM growth_checkins
-                WHERE relationship_id=?
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
-                (relationship_id, limit),
-            ).fetchall()
-    return rows
+            return c.execute(_Q_GROWTH_TIMELINE_BY_RESP, (relationship_id, respondent, limit)).fetchall()
+        return c.execute(_Q_GROWTH_TIMELINE, (relationship_id, limit)).fetchall()
 
 
 def get_latest_growth_checkin(relationship_id, respondent=None):
-    rows = list_growth_checkins(relationship_id, respondent=respondent, limit=1)
-    return rows[0] if rows else None
+    return _latest_checkin_cache.get_or_set(
+        (relationship_id, respondent), lambda: _load_latest_growth_checkin(relationship_id, respondent)
+    )
 
 
-def save_growth_reflection(reflection_id, relationship_id, respondent, month_key, prompt_text, response_text):
-    with conn() as c:
+def _load_latest_growth_checkin(relationship_id, respondent):
+    with rconn() as c:
+        if respondent:
+            return c.execute(_Q_LATEST_CHECKIN_BY_RESP, (relationship_id, respondent)).fetchone()
+        return c.execute(_Q_LATEST_CHECKIN, (relationship_id,)).fetchone()
+
+
+def save_growth_reflection(reflection_id, relationship_id, respondent, month_key, prompt_text, response_text, *, cur=None):
+    with conn_for(cur) as c:
         c.execute(
             """
             INSERT INTO growth_reflections(reflection_id, relationship_id, respondent, created_at, month_key, prompt_text, response_text)
@@ -417,23 +890,13 @@ def save_growth_reflection(reflection_id, relationship_id, respondent, month_key
 
 
 def list_growth_reflections(relationship_id, respondent=None, limit=50):
-    with conn() as c:
+    with rconn() as c:
         if respondent:
             return c.execute(
-                """
-                SELECT * FROM growth_reflections
-                WHERE relationship_id=? AND respondent=?
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
+                _Q_GROWTH_REFLECTIONS_BY_RESP,
                 (relationship_id, respondent, limit),
             ).fetchall()
         return c.execute(
-            """
-            SELECT * FROM growth_reflections
-            WHERE relationship_id=?
-            ORDER BY created_at DESC
-            LIMIT ?
-            """,
+            _Q_GROWTH_REFLECTIONS,
             (relationship_id, limit),
         ).fetchall()
@@ -1,9 +1,10 @@
 from dotenv import load_dotenv
 load_dotenv()
 import os
-import json
+import threading
 from typing import Dict, Any, List
 
+import fastjson
 from prompts import SYSTEM
 
 
@@ -54,6 +55,13 @@ Write a deep, non-clinical research-style brief that:
 {output_spec}
 """
 
+# The output spec never changes: substitute it once (its braces escaped for the later
+# .format) so each call only fills in the mode and the four JSON payloads.
+_USER_PROMPT_TEMPLATE = DEEP_RESEARCH_USER_PROMPT.replace(
+    "{output_spec}",
+    DEEP_RESEARCH_OUTPUT_SPEC.strip().replace("{", "{{").replace("}", "}}"),
+)
+
 
 def _require_api_key() -> str:
     key = (os.getenv("OPENAI_API_KEY") or "").strip()
@@ -62,10 +70,20 @@ def _require_api_key() -> str:
     return key
 
 
+# One client per process: it owns an HTTP keep-alive pool, so later calls skip DNS and TLS setup.
+_CLIENT = None
+_client_lock = threading.Lock()
+
+
 def _get_client():
-    # New SDK path (recommended)
-    from openai import OpenAI
-    return OpenAI(api_key=_require_api_key())
+    global _CLIENT
+    if _CLIENT is None:
+        with _client_lock:
+            if _CLIENT is None:
+                # New SDK path (recommended)
+                from openai import OpenAI
+                _CLIENT = OpenAI(api_key=_require_api_key())
+    return _CLIENT
 
 
 def _strip_code_fences(s: str) -> str:
@@ -90,30 +108,42 @@ def _extract_json(raw: str) -> Dict[str, Any]:
     raw = _strip_code_fences(raw)
 
     try:
-        return json.loads(raw)
+        return fastjson.loads(raw)
     except Exception:
         pass
 
     s = raw.find("{")
     e = raw.rfind("}")
     if s != -1 and e != -1 and e > s:
-        return json.loads(raw[s : e + 1])
+        return fastjson.loads(raw[s : e + 1])
 
     raise ValueError("Model did not return valid JSON.")
 
 
+# Models that answered response_format with a 400; they get plain prompts from then on.
+_NO_JSON_MODE = set()
+
+
 def _chat(model: str, system: str, user: str) -> str:
     client = _get_client()
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        temperature=0.2,
-    )
-    content = resp.choices[0].message.content
-    return content or ""
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+    if model not in _NO_JSON_MODE:
+        try:
+            # JSON mode: the reply is a bare JSON object, no code fences or surrounding prose.
+            resp = client.chat.completions.create(
+                model=model, messages=messages, temperature=0.2, response_format={"type": "json_object"}
+            )
+            return resp.choices[0].message.content or ""
+        except Exception as e:
+            if getattr(e, "status_code", None) != 400:
+                raise
+            # No JSON mode on this model; run_deep_research falls back to _extract_json.
+            _NO_JSON_MODE.add(model)
+    resp = client.chat.completions.create(model=model, messages=messages, temperature=0.2)
+    return resp.choices[0].message.content or ""
 
 
 def run_deep_research(
@@ -124,15 +154,18 @@ def run_deep_research(
     deltas_over_time: List[Dict[str, Any]],
     model: str = "gpt-4o-mini",
 ) -> Dict[str, Any]:
-    prompt = DEEP_RESEARCH_USER_PROMPT.format(
+    prompt = _USER_PROMPT_TEMPLATE.format(
         mode=mode,
-        scores_json=json.dumps(dimension_scores, ensure_ascii=False),
-        quotes_json=json.dumps(key_quotes, ensure_ascii=False),
-        contradictions_json=json.dumps(contradictions, ensure_ascii=False),
-        deltas_json=json.dumps(deltas_over_time, ensure_ascii=False),
-        output_spec=DEEP_RESEARCH_OUTPUT_SPEC.strip(),
+        scores_json=fastjson.dumps(dimension_scores),
+        quotes_json=fastjson.dumps(key_quotes),
+        contradictions_json=fastjson.dumps(contradictions),
+        deltas_json=fastjson.dumps(deltas_over_time),
     )
 
     raw = _chat(model=model, system=DEEP_RESEARCH_SYSTEM, user=prompt)
-    return _extract_json(raw)
+    try:
+        return fastjson.loads(raw)
+    except ValueError:
+        # Models/proxies without JSON mode can still wrap the object in fences or prose.
+        return _extract_json(raw)
 
@@ -0,0 +1,25 @@
+# fastjson.py
+import json
+from typing import Any, Union
+
+# orjson is optional: a C/Rust parser that is several times faster on the small payloads
+# stored per row (metrics, answer meta) and on whole question banks. Falls back to json.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def loads(data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    def loads(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(obj: Any) -> str:
+        # Same compact, non-ASCII-escaped output orjson produces.
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
@@ -1,14 +1,14 @@
 from __future__ import annotations
-import json
-import uuid
+import re
 from datetime import datetime
 from typing import Dict, Any
 
 import streamlit as st
 
+import fastjson
 from db import (
-    list_growth_checkins, save_growth_checkin, get_latest_growth_checkin,
-    list_growth_reflections, save_growth_reflection,
+    list_growth_timeline, save_growth_checkin, get_latest_growth_checkin,
+    list_growth_reflections, save_growth_reflection, new_id,
 )
 
 # -------------------- Row-safe helpers --------------------
@@ -29,17 +29,26 @@ def _rget(row, key: str, default=None):
     return default
 
 
+_TIMELINE_PAGE_SIZE = 20
+
+_BARS = tuple("▓" * i + "░" * (5 - i) for i in range(6))
+
+
 def _mini_bar(label: str, value_0_5: int, help_text: str = ""):
-    value_0_5 = max(0, min(5, int(value_0_5)))
-    blocks = "▓" * value_0_5 + "░" * (5 - value_0_5)
+    blocks = _BARS[max(0, min(5, int(value_0_5)))]
     st.markdown(f"**{label}**  {blocks}")
     if help_text:
         st.caption(help_text)
 
 
 def _parse_metrics(row) -> Dict[str, Any]:
+    # Prefer the score columns; the dashboard queries no longer select metrics_json at all
+    # (init_db backfills the columns from it), so the JSON path is only for full rows.
+    clarity = _rget(row, "clarity_score")
+    if clarity is not None:
+        return {"clarity": clarity, "cost": _rget(row, "cost_score"), "agency": _rget(row, "agency_score")}
     try:
-        return json.loads(_rget(row, "metrics_json", "") or "{}")
+        return fastjson.loads(_rget(row, "metrics_json", "") or "{}")
     except Exception:
         return {}
 
@@ -59,6 +68,10 @@ def _default_prompt_for_month() -> str:
     return prompts[(m - 1) % len(prompts)]
 
 
+# Substring match, like the old `tok in text` loop (no word boundary: "painful" counts).
+_HEAVY_RE = re.compile(r"heavy|exhaust|resent|tired|stuck|pain|lonely|anxious|burden", re.IGNORECASE)
+
+
 def _metrics_from_checkin(pattern_text: str, cost_text: str, repair_choice: str, agency_choice: str) -> Dict[str, int]:
     clarity = 2
     if len((pattern_text or "").strip()) >= 60:
@@ -67,9 +80,7 @@ def _metrics_from_checkin(pattern_text: str, cost_text: str, repair_choice: str,
         clarity = 3
 
     cost = 3
-    heavy_tokens = ["heavy", "exhaust", "resent", "tired", "stuck", "pain", "lonely", "anxious", "burden"]
-    t = (cost_text or "").lower()
-    if any(tok in t for tok in heavy_tokens):
+    if _HEAVY_RE.search(cost_text or ""):
         cost = 4
     if len((cost_text or "").strip()) >= 80:
         cost = min(5, cost + 1)
@@ -120,43 +131,51 @@ def render_growth_dashboard(relationship_id: str, mode: str, respondent: str):
     st.divider()
 
     st.subheader("Your timeline")
-    rows = list_growth_checkins(relationship_id, respondent=None if mode == "duo" else respondent, limit=50)
+    who = None if mode == "duo" else respondent
+    pages_key = f"growth_pages_{relationship_id}_{who}"
+    pages = st.session_state.setdefault(pages_key, 1)
+    # One query for every page shown so far, plus a row to tell whether there is more.
+    shown = pages * _TIMELINE_PAGE_SIZE
+    rows = list_growth_timeline(relationship_id, respondent=who, limit=shown + 1)
+    has_more = len(rows) > shown
+    rows = rows[:shown]
     if not rows:
         st.write("No check-ins yet.")
     else:
-        for r in rows:
-            month_key = _rget(r, "month_key", "") or ""
-            created_at = _rget(r, "created_at", "") or ""
+        # Column order is fixed by list_growth_timeline's SELECT, so unpack instead of _rget.
+        for _, _, month_key, created_at, repair_choice, pattern_text, shift_text, clarity, cost, agency in rows:
             with st.container(border=True):
                 st.markdown(
-                    f"**{month_key}**  ·  <span style='color:#666'>{created_at}</span>",
+                    f"**{month_key or ''}**  ·  <span style='color:#666'>{created_at or ''}</span>",
                     unsafe_allow_html=True
                 )
 
                 bullets = []
-                repair_choice = _rget(r, "repair_choice", "")
                 if repair_choice:
                     bullets.append(f"Repair: {repair_choice}")
 
-                shift_text = (_rget(r, "shift_text", "") or "").strip()
+                shift_text = (shift_text or "").strip()
                 if shift_text:
                     bullets.append("Shift: " + shift_text[:120])
 
                 for b in bullets[:3]:
                     st.markdown(f"- {b}")
 
-                quote = (_rget(r, "pattern_text", "") or "").strip()
+                quote = (pattern_text or "").strip()
                 if quote:
                     st.markdown(f"> {quote[:200]}")
 
-                m = _parse_metrics(r)
                 c1, c2, c3 = st.columns(3)
                 with c1:
-                    _mini_bar("Clarity", m.get("clarity", 3))
+                    _mini_bar("Clarity", 3 if clarity is None else clarity)
                 with c2:
-                    _mini_bar("Cost", m.get("cost", 3))
+                    _mini_bar("Cost", 3 if cost is None else cost)
                 with c3:
-                    _mini_bar("Agency", m.get("agency", 3))
+                    _mini_bar("Agency", 3 if agency is None else agency)
+
+        if has_more and st.button("Load more", key=f"{pages_key}_more"):
+            st.session_state[pages_key] = pages + 1
+            st.rerun()
 
     st.divider()
 
@@ -182,7 +201,7 @@ def render_growth_dashboard(relationship_id: str, mode: str, respondent: str):
         if st.form_submit_button("Save check-in"):
             metrics = _metrics_from_checkin(pattern_text, cost_text, repair_choice, agency_choice)
             save_growth_checkin(
-                checkin_id=str(uuid.uuid4()),
+                checkin_id=new_id(),
                 relationship_id=relationship_id,
                 mode=mode,
                 respondent=respondent,
@@ -192,7 +211,7 @@ def render_growth_dashboard(relationship_id: str, mode: str, respondent: str):
                 repair_choice=repair_choice,
                 agency_choice=agency_choice,
                 shift_text=shift_text.strip(),
-                metrics_json=json.dumps(metrics),
+                metrics_json=fastjson.dumps(metrics),
             )
             st.success("Saved. Nothing to fix. Nothing to decide — just something you can now see.")
             st.rerun()
@@ -208,7 +227,7 @@ def render_growth_dashboard(relationship_id: str, mode: str, respondent: str):
         if st.form_submit_button("Save reflection"):
             if response.strip():
                 save_growth_reflection(
-                    reflection_id=str(uuid.uuid4()),
+                    reflection_id=new_id(),
                     relationship_id=relationship_id,
                     respondent=respondent,
                     month_key=_month_key_now(),
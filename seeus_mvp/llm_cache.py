@@ -0,0 +1,119 @@
+# llm_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from ttl_cache import TTLCache
+
+# Exact-match cache for chat completions: an in-process tier in front of a small SQLite file
+# that survives restarts. Same model + system + user prompt (up to whitespace and case) ->
+# same stored reply.
+CACHE_PATH = Path(os.getenv("SEEUS_LLM_CACHE_PATH", "llm_cache.db"))
+TTL_SECONDS = float(os.getenv("SEEUS_LLM_CACHE_TTL", str(7 * 24 * 3600)))  # 0 disables caching
+
+# Replies can be several KB each; the SQLite tier holds the long tail.
+_memory = TTLCache(ttl=min(TTL_SECONDS, 3600), maxsize=256)
+_conn = None
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return TTL_SECONDS > 0
+
+
+def _normalize(text: str) -> str:
+    # Answers that differ only in spacing, line breaks or letter case build the same key.
+    return " ".join((text or "").split()).casefold()
+
+
+def cache_key(model: str, system: str, user: str) -> str:
+    payload = json.dumps(
+        {"m": model, "s": _normalize(system), "u": _normalize(user)}, sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        c = sqlite3.connect(CACHE_PATH, check_same_thread=False, isolation_level=None)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        # Expired rows are never read again; clear them out once per process.
+        c.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        _conn = c
+    return _conn
+
+
+def get(key: str) -> Optional[str]:
+    hit = _memory.get(key)
+    if hit is not None:
+        return hit
+    with _lock:
+        row = _db().execute(
+            "SELECT content FROM llm_cache WHERE key=? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+    if row is None:
+        return None
+    _memory.set(key, row[0])
+    return row[0]
+
+
+def put(key: str, content: str) -> None:
+    _memory.set(key, content)
+    with _lock:
+        _db().execute(
+            "INSERT OR REPLACE INTO llm_cache(key, content, expires_at) VALUES(?, ?, ?)",
+            (key, content, time.time() + TTL_SECONDS),
+        )
+
+
+def delete(key: str) -> None:
+    _memory.invalidate(key)
+    with _lock:
+        _db().execute("DELETE FROM llm_cache WHERE key=?", (key,))
+
+
+def _usable(content: Optional[str], validate: Optional[Callable[[str], bool]]) -> bool:
+    if not content:
+        return False
+    if validate is None:
+        return True
+    try:
+        return bool(validate(content))
+    except Exception:
+        return False
+
+
+def cached_completion(
+    model: str,
+    system: str,
+    user: str,
+    call: Callable[[], str],
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    # Returns the stored reply when there is one, otherwise runs call(). Only replies that pass
+    # validate() (e.g. parse as the expected JSON) are stored, so a truncated or malformed reply
+    # is retried on the next call instead of being served back until it expires.
+    if not enabled():
+        return call()
+    key = cache_key(model, system, user)
+    content = get(key)
+    if content is not None:
+        if _usable(content, validate):
+            return content
+        delete(key)
+    content = call()
+    if _usable(content, validate):
+        put(key, content)
+    return content
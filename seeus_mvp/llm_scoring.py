@@ -1,18 +1,78 @@
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional
-from prompts import SYSTEM, make_dimension_prompt
-from questions import QUESTIONS
+import llm_cache
+from rate_limit import RateLimiter
+from prompts import SYSTEM, make_all_dimensions_prompt, make_dimension_prompt
+from questions import QUESTION_BY_ID as q_lookup
+
+# Upper bound on concurrent chat completions per scoring run.
+MAX_PARALLEL_CALLS = int(os.getenv("SEEUS_LLM_PARALLEL", "6"))
+
+# Paces the parallel calls under the account's limits (set to your tier; 0 = no limit) and
+# backs off on 429s.
+_limiter = RateLimiter(
+    max_requests_per_minute=float(os.getenv("SEEUS_LLM_MAX_RPM", "500")),
+    max_tokens_per_minute=float(os.getenv("SEEUS_LLM_MAX_TPM", "200000")),
+)
 
 # --- OpenAI client wrapper (supports modern python SDK) ---
+# One client per process: its HTTP connection pool (keep-alive, TLS sessions) is shared by
+# every dimension call and every Streamlit session instead of being rebuilt per scoring run.
+_CLIENT = None
+_client_lock = threading.Lock()
+
 def _get_client():
-    try:
-        from openai import OpenAI  # new SDK (>=1.0)
-        return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    except Exception:
-        return None
+    global _CLIENT
+    if _CLIENT is None:
+        with _client_lock:
+            if _CLIENT is None:
+                try:
+                    from openai import OpenAI  # new SDK (>=1.0)
+                    _CLIENT = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                except Exception:
+                    return None
+    return _CLIENT
+
+def _chat_completion(client, model: str, system: str, user: str, json_mode: bool = False) -> str:
+    # Identical prompts (re-runs, retries, unchanged answers) are served from llm_cache.
+    # JSON-mode replies are keyed apart from free-text ones made before it was switched on,
+    # and are only stored once they parse.
+    return llm_cache.cached_completion(
+        f"{model}:json" if json_mode else model, system, user,
+        lambda: _limiter.call(
+            lambda: _call_model(client, model, system, user, json_mode),
+            est_tokens=RateLimiter.estimate_tokens(system, user),
+        ),
+        validate=_is_json_object if json_mode else None,
+    )
+
+def _is_json_object(raw: str) -> bool:
+    return isinstance(_parse_json(raw), dict)
+
+# Models that answered response_format with a 400; they get plain prompts from then on.
+_NO_JSON_MODE = set()
 
-def _chat_completion(client, model: str, system: str, user: str) -> str:
+def _is_bad_request(exc: Exception) -> bool:
+    # openai>=1 raises BadRequestError (status_code 400); the legacy SDK InvalidRequestError.
+    return getattr(exc, "status_code", None) == 400 or type(exc).__name__ in ("BadRequestError", "InvalidRequestError")
+
+def _call_model(client, model: str, system: str, user: str, json_mode: bool = False) -> str:
+    if json_mode and model not in _NO_JSON_MODE:
+        try:
+            return _create(client, model, system, user, {"response_format": {"type": "json_object"}})
+        except Exception as e:
+            if not _is_bad_request(e):
+                raise
+            # No JSON mode on this model; the prompt still asks for JSON and _parse_json
+            # digs the object out of any surrounding text.
+            _NO_JSON_MODE.add(model)
+    return _create(client, model, system, user, {})
+
+def _create(client, model: str, system: str, user: str, extra: Dict[str, Any]) -> str:
+    # temperature=0: replies are cached, so keep them as reproducible as the model allows.
     # New SDK path
     if client is not None:
         resp = client.chat.completions.create(
@@ -21,7 +81,8 @@ def _chat_completion(client, model: str, system: str, user: str) -> str:
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
-            temperature=0.2,
+            temperature=0,
+            **extra,
         )
         return resp.choices[0].message.content
 
@@ -34,64 +95,134 @@ def _chat_completion(client, model: str, system: str, user: str) -> str:
             {"role": "system", "content": system},
             {"role": "user", "content": user},
         ],
-        temperature=0.2,
+        temperature=0,
+        **extra,
     )
     return resp["choices"][0]["message"]["content"]
 
+def _question_text(q: Dict[str, Any]) -> str:
+    # questions.QUESTIONS carries tone variants under "prompt"; "text" is the flat form.
+    return q.get("text") or q["prompt"]["default"]
+
 def _group_inputs_by_dimension(answers: Dict[str, str]) -> Dict[str, str]:
     dim_text: Dict[str, List[str]] = {}
-    q_lookup = {q["id"]: q for q in QUESTIONS}
     for qid, ans in answers.items():
         q = q_lookup.get(qid)
         if not q:
             continue
         dim = q["dimension"]
-        dim_text.setdefault(dim, []).append(f"- {q['text']}\n  Answer: {ans}" )
+        dim_text.setdefault(dim, []).append(f"- {_question_text(q)}\n  Answer: {ans}" )
     return {dim: "\n".join(lines) for dim, lines in dim_text.items()}
 
+def _build_dim_inputs(answers_a: Dict[str, str], answers_b: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+    """{dimension: (Person A inputs, Person B inputs)} in sorted dimension order."""
+    a_by_dim = _group_inputs_by_dimension(answers_a)
+    b_by_dim = _group_inputs_by_dimension(answers_b)
+    return {
+        dim: (a_by_dim.get(dim, "(none)"), b_by_dim.get(dim, "(none)"))
+        for dim in sorted(a_by_dim.keys() | b_by_dim.keys())
+    }
+
+def _build_dim_prompts(dims_payload: Dict[str, Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """[(dimension, per-dimension prompt), ...] for the dimensions scored one by one."""
+    return [(dim, make_dimension_prompt(dim, a_text, b_text)) for dim, (a_text, b_text) in dims_payload.items()]
+
 def score_duo_llm(
     answers_a: Dict[str, str],
     answers_b: Dict[str, str],
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
 ) -> List[Dict[str, Any]]:
     """Return list of per-dimension dicts: {dimension, score(0-10), confidence, rationale, prompts_next}."""
     if not os.getenv("OPENAI_API_KEY"):
         raise RuntimeError("Missing OPENAI_API_KEY environment variable.")
 
+    dims_payload = _build_dim_inputs(answers_a, answers_b)
+    if not dims_payload:
+        return []
+
     client = _get_client()
-    a_by_dim = _group_inputs_by_dimension(answers_a)
-    b_by_dim = _group_inputs_by_dimension(answers_b)
+    # One request for every dimension: the system prompt and rubric are sent once instead of
+    # once per dimension. Anything the combined reply is missing is scored one by one.
+    results = _run_combined(client, model, dims_payload)
+    missing = {dim: dims_payload[dim] for dim in dims_payload if dim not in results}
+    if missing:
+        results.update(_run_sync(client, model, _build_dim_prompts(missing)))
+    return [results[dim] for dim in dims_payload]
 
-    all_dims = sorted(set(a_by_dim.keys()) | set(b_by_dim.keys()))
-    out: List[Dict[str, Any]] = []
+def _parse_json(raw: str) -> Dict[str, Any]:
+    # Requests run in JSON mode, so this is normally a bare object; the brace scan only runs
+    # when a reply still arrives wrapped in prose.
+    try:
+        return json.loads(raw)
+    except Exception:
+        start = raw.find("{")
+        end = raw.rfind("}")
+        if start != -1 and end != -1 and end > start:
+            return json.loads(raw[start:end+1])
+        raise
 
-    for dim in all_dims:
-        prompt = make_dimension_prompt(dim, a_by_dim.get(dim, "(none)"), b_by_dim.get(dim, "(none)"))
-        raw = _chat_completion(client, model=model, system=SYSTEM, user=prompt)
+def _result_from_reply(raw: str, dim: str) -> Dict[str, Any]:
+    # One unreadable reply costs its own dimension (scored 0, so overall_from_llm skips it),
+    # not the results of every other dimension in the run.
+    try:
+        data = _parse_json(raw or "")
+    except Exception:
+        data = None
+    if not isinstance(data, dict):
+        return {
+            "dimension": dim,
+            "score": 0.0,
+            "confidence": "Low",
+            "rationale": "The model's reply for this dimension could not be read.",
+            "prompts_next": [],
+        }
+    return _normalize_result(data, dim)
 
-        # Parse JSON robustly
-        try:
-            data = json.loads(raw)
-        except Exception:
-            # attempt to extract JSON block
-            start = raw.find("{")
-            end = raw.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                data = json.loads(raw[start:end+1])
-            else:
-                raise
+def _normalize_result(data: Dict[str, Any], dim: str) -> Dict[str, Any]:
+    data["dimension"] = data.get("dimension") or dim
+    try:
+        data["score"] = float(data.get("score"))
+    except Exception:
+        data["score"] = 0.0
+    return data
 
-        # Normalize
-        data["dimension"] = data.get("dimension") or dim
-        try:
-            data["score"] = float(data.get("score"))
-        except Exception:
-            data["score"] = 0.0
-        out.append(data)
+def _run_sync(client, model: str, dim_prompts: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """{dimension: result}, one chat completion per prompt."""
+    def complete(prompt: str) -> str:
+        return _chat_completion(client, model=model, system=SYSTEM, user=prompt, json_mode=True)
+
+    # Dimensions are independent requests, so run them concurrently; the calls are network-bound
+    # and the SDK client is thread-safe. max_workers caps in-flight requests (rate limits).
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CALLS, len(dim_prompts))) as pool:
+        raws = list(pool.map(complete, [prompt for _, prompt in dim_prompts]))
+    return {dim: _result_from_reply(raw, dim) for (dim, _), raw in zip(dim_prompts, raws)}
 
+def _run_combined(client, model: str, dims_payload: Dict[str, Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """{dimension: result} from a single combined request; empty if the reply can't be used."""
+    try:
+        raw = _chat_completion(
+            client, model=model, system=SYSTEM, user=make_all_dimensions_prompt(dims_payload), json_mode=True
+        )
+        items = _parse_json(raw).get("results") or []
+    except Exception:
+        return {}
+    by_name = {dim.casefold(): dim for dim in dims_payload}
+    out: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        dim = by_name.get(str(item.get("dimension") or "").strip().casefold())
+        if dim and dim not in out:
+            item["dimension"] = dim
+            out[dim] = _normalize_result(item, dim)
     return out
 
 def overall_from_llm(dim_scores: List[Dict[str, Any]]) -> float:
-    vals = [float(d.get("score", 0)) for d in dim_scores if d.get("score") is not None]
-    vals = [v for v in vals if v > 0]
-    return round(sum(vals)/len(vals), 1) if vals else 0.0
+    # One pass, no intermediate lists; unscored (None / 0) dimensions don't count.
+    total, n = 0.0, 0
+    for d in dim_scores:
+        v = float(d.get("score") or 0.0)
+        if v > 0:
+            total += v
+            n += 1
+    return round(total / n, 1) if n else 0.0
@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
 SYSTEM = """
 You are SeeUs, a relationship compatibility assessment engine.
 Be warm, clear, non-judgmental, and never diagnose.
@@ -21,6 +24,8 @@ Also return:
 Never mention policies or that you are an AI.
 """
 
+# Pure function of its strings: re-scoring unchanged answers (retries, re-runs) reuses the prompt.
+@lru_cache(maxsize=512)
 def make_dimension_prompt(dimension: str, a_text: str, b_text: str) -> str:
     return f"""
 Dimension: {dimension}
@@ -36,3 +41,20 @@ Person B inputs:
 Return JSON with keys:
 dimension, score, confidence, rationale, prompts_next
 """
+
+def make_all_dimensions_prompt(dims_payload: Dict[str, Tuple[str, str]]) -> str:
+    """All dimensions in one request. dims_payload maps dimension -> (Person A inputs, Person B inputs)."""
+    blocks = "\n\n".join(
+        f"### Dimension: {dimension}\n\nPerson A inputs:\n{a_text}\n\nPerson B inputs:\n{b_text}"
+        for dimension, (a_text, b_text) in dims_payload.items()
+    )
+    return f"""
+Score each dimension below on its own.
+
+{blocks}
+
+{DIMENSION_RUBRIC}
+
+Return a JSON object with key "results": a list with exactly one object per dimension above,
+each with keys: dimension (exactly as written above), score, confidence, rationale, prompts_next
+"""
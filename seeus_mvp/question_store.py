@@ -1,6 +1,30 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
 import requests
 import streamlit as st
 
+from fastjson import loads as _loads
+
+# Keyword -> prompt variant, checked in order (sharpest first, as the tone labels overlap).
+_TONE_KEYWORDS = (
+    ("sugar", "sharp"),
+    ("sharp", "sharp"),
+    ("clear", "clear"),
+    ("direct", "clear"),
+    ("gentle", "gentle"),
+)
+
+@lru_cache(maxsize=16)
+def tone_key(tone: str) -> str:
+    t = (tone or "Gentle").lower()
+    for kw, key in _TONE_KEYWORDS:
+        if kw in t:
+            return key
+    return "default"
+
 def _validate_bank(data: list[dict]):
     if not isinstance(data, list):
         raise ValueError("Question bank must be a list")
@@ -13,14 +37,71 @@ def _validate_bank(data: list[dict]):
             raise ValueError(f"Duplicate question id: {q['id']}")
         seen.add(q["id"])
 
+_BANK_CACHE_DIR = Path(".cache")
+
+def _bank_cache_path(url: str) -> Path:
+    return _BANK_CACHE_DIR / f"questionbank-{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+def _read_bank_cache(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def _write_bank_cache(path: Path, entry: dict) -> None:
+    # Best effort: a read-only filesystem just means no conditional GET next time.
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+    except OSError:
+        pass
+
 @st.cache_data(show_spinner=False)
 def load_question_bank(url: str) -> list[dict]:
     if not url:
         raise RuntimeError("QUESTIONS_URL is not set")
 
-    resp = requests.get(url, timeout=10)
+    # Conditional GET against the last validated copy on disk: an unchanged bank comes back
+    # as 304 with no body, and is neither downloaded nor re-validated.
+    path = _bank_cache_path(url)
+    cached = _read_bank_cache(path)
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    resp = requests.get(url, timeout=10, headers=headers)
+    if resp.status_code == 304 and "body" in cached:
+        return _loads(cached["body"])
     resp.raise_for_status()
-    data = resp.json()
+    data = _loads(resp.content)
 
     _validate_bank(data)
-    return data 
+    _write_bank_cache(path, {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "body": resp.text,
+    })
+    return data
+
+_PROMPT_KEYS = ("sharp", "clear", "gentle", "default")
+
+@st.cache_resource(show_spinner=False)
+def prompt_table(url: str) -> dict:
+    # (question_id, tone key) -> resolved prompt text, built once per bank.
+    table = {}
+    for q in load_question_bank(url):
+        pr = q.get("prompt") or {}
+        for key in _PROMPT_KEYS:
+            table[(q["id"], key)] = pr.get(key) or pr.get("default") or q.get("text") or ""
+    return table
+
+@lru_cache(maxsize=256)
+def answer_json(dimension, skipped: bool = False) -> str:
+    # answer_json payload stored with each response; same bytes as the inline json.dumps it replaces.
+    if skipped:
+        return json.dumps({"skipped": True, "dimension": dimension})
+    return json.dumps({"dimension": dimension})
@@ -0,0 +1,74 @@
+# rate_limit.py
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute` tokens per minute.
+    A limit of 0 (or less) means unlimited: acquire() never waits.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        if self.capacity <= 0:
+            return
+        # A request bigger than the whole bucket waits for a full bucket instead of forever.
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """
+    Proactive requests-per-minute and tokens-per-minute throttle, plus retries with jittered
+    exponential backoff for the rate-limit errors that still get through.
+    """
+
+    def __init__(self, max_requests_per_minute: float, max_tokens_per_minute: float, max_attempts: int = 6):
+        self.requests = TokenBucket(max_requests_per_minute)
+        self.tokens = TokenBucket(max_tokens_per_minute)
+        self.max_attempts = max_attempts
+
+    @staticmethod
+    def estimate_tokens(*texts: str) -> int:
+        # ~4 characters per token for English text; close enough for pacing.
+        return sum(len(t or "") for t in texts) // 4 + 1
+
+    def call(self, fn: Callable[[], T], est_tokens: int = 1, is_retryable: Optional[Callable[[Exception], bool]] = None) -> T:
+        is_retryable = is_retryable or is_rate_limit_error
+        for attempt in range(self.max_attempts):
+            self.requests.acquire()
+            self.tokens.acquire(est_tokens)
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == self.max_attempts - 1 or not is_retryable(e):
+                    raise
+                # Full jitter: uniform in [1, min(30, 2^attempt)] seconds.
+                time.sleep(random.uniform(1.0, max(1.0, min(30.0, 2.0 ** attempt))))
+        raise RuntimeError("unreachable")
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    # Matches openai.RateLimitError (new SDK) and openai.error.RateLimitError (legacy)
+    # without importing openai here.
+    return type(e).__name__ == "RateLimitError" or getattr(e, "status_code", None) == 429
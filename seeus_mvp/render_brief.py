@@ -4,24 +4,25 @@ import streamlit as st
 
 def render_brief(brief: Dict[str, Any]):
     st.subheader(brief.get("title", "Relational Dynamics Brief"))
+    md = st.markdown  # bound once; called for every line below
 
     def sec(title: str):
-        st.markdown(f"### {title}")
+        md(f"### {title}")
 
     sec("Observed patterns")
     patterns = brief.get("observed_patterns") or []
     if not patterns:
         st.info("No patterns available.")
     for p in patterns:
-        st.markdown(f"**{p.get('headline','')}**")
+        md(f"**{p.get('headline','')}**")
         evidence = p.get("evidence") or []
         if evidence:
-            st.markdown("**Evidence (from your answers):**")
+            md("**Evidence (from your answers):**")
             for e in evidence[:6]:
-                st.markdown(f"- {e}")
+                md(f"- {e}")
         w = p.get("why_it_matters")
         if w:
-            st.markdown(f"**Why it matters:** {w}")
+            md(f"**Why it matters:** {w}")
         st.divider()
 
     sec("What tends to happen")
@@ -29,17 +30,19 @@ def render_brief(brief: Dict[str, Any]):
     if not wth:
         st.write("None listed.")
     for item in wth[:6]:
-        st.markdown(f"**{item.get('headline','')}**")
-        if item.get("mechanism"):
-            st.markdown(f"- **Mechanism:** {item.get('mechanism')}")
-        if item.get("conditions"):
-            st.markdown(f"- **Conditions:** {item.get('conditions')}")
+        md(f"**{item.get('headline','')}**")
+        mech = item.get("mechanism")
+        if mech:
+            md(f"- **Mechanism:** {mech}")
+        cond = item.get("conditions")
+        if cond:
+            md(f"- **Conditions:** {cond}")
 
     sec("Early wins")
     ew = brief.get("early_wins") or []
     if ew:
         for x in ew[:10]:
-            st.markdown(f"- {x}")
+            md(f"- {x}")
     else:
         st.write("None listed.")
 
@@ -48,34 +51,38 @@ def render_brief(brief: Dict[str, Any]):
     if not fms:
         st.write("None listed.")
     for fm in fms[:8]:
-        st.markdown(f"**{fm.get('name','')}**  _(risk: {fm.get('risk_level','')})_")
-        if fm.get("how_it_starts"):
-            st.markdown(f"- **How it starts:** {fm.get('how_it_starts')}")
-        if fm.get("how_it_ends"):
-            st.markdown(f"- **How it ends:** {fm.get('how_it_ends')}")
+        md(f"**{fm.get('name','')}**  _(risk: {fm.get('risk_level','')})_")
+        starts = fm.get("how_it_starts")
+        if starts:
+            md(f"- **How it starts:** {starts}")
+        ends = fm.get("how_it_ends")
+        if ends:
+            md(f"- **How it ends:** {ends}")
 
     sec("Leverage points")
     lps = brief.get("leverage_points") or []
     if not lps:
         st.write("None listed.")
     for lp in lps[:8]:
-        st.markdown(f"**{lp.get('action','')}**")
-        if lp.get("why"):
-            st.markdown(f"- **Why:** {lp.get('why')}")
-        if lp.get("how_to_try"):
-            st.markdown(f"- **How to try:** {lp.get('how_to_try')}")
+        md(f"**{lp.get('action','')}**")
+        why = lp.get("why")
+        if why:
+            md(f"- **Why:** {why}")
+        how = lp.get("how_to_try")
+        if how:
+            md(f"- **How to try:** {how}")
 
     sec("Stay / Change / Leave lens")
     scl = brief.get("stay_change_leave_lens") or {}
-    st.markdown(f"**Stay as-is:** {scl.get('stay_as_is','')}")
-    st.markdown(f"**Change one thing:** {scl.get('change_one_thing','')}")
-    st.markdown(f"**If nothing changes:** {scl.get('if_nothing_changes','')}")
+    md(f"**Stay as-is:** {scl.get('stay_as_is','')}")
+    md(f"**Change one thing:** {scl.get('change_one_thing','')}")
+    md(f"**If nothing changes:** {scl.get('if_nothing_changes','')}")
 
     sec("Follow-up questions")
     fu = brief.get("follow_up_questions") or []
     if fu:
         for x in fu[:10]:
-            st.markdown(f"- {x}")
+            md(f"- {x}")
     else:
         st.write("None.")
 
@@ -83,6 +90,6 @@ def render_brief(brief: Dict[str, Any]):
     lim = brief.get("limits") or []
     if lim:
         for x in lim[:10]:
-            st.markdown(f"- {x}")
+            md(f"- {x}")
     else:
         st.write("None.")
@@ -1,9 +1,16 @@
+import re
 from typing import Dict, List, Any, Tuple
-from questions import QUESTIONS
+from questions import QUESTION_BY_ID as q_lookup
+
+_NUM_RE = re.compile(r"(?<!\d)(\d+(?:\.\d+)?)")
+_TOK_RE = re.compile(r"[a-zA-Z']{4,}")
+
+# Marker tokens for the freedom vs structure check in detect_contradictions.
+_FREEDOM_TOKS = frozenset({"freedom"})
+_STRUCTURE_TOKS = frozenset({"control", "structure"})
 
 def build_key_quotes(latest_a: Dict[str, str], latest_b: Dict[str, str], mode: str) -> Dict[str, List[str]]:
     # Keep it simple: 1 quote per question, grouped by dimension.
-    q_lookup = {q["id"]: q for q in QUESTIONS}
     grouped: Dict[str, List[str]] = {}
 
     def add(person_label: str, answers: Dict[str, str]):
@@ -32,8 +39,7 @@ def detect_contradictions(latest_a: Dict[str, str], latest_b: Dict[str, str], mo
     out: List[Dict[str, Any]] = []
 
     def find_closeness(text: str):
-        import re
-        nums = [float(x) for x in re.findall(r"(?<!\d)(\d+(?:\.\d+)?)", text or "")]
+        nums = [float(x) for x in _NUM_RE.findall(text or "")]
         for n in nums:
             if 0 <= n <= 10:
                 return n
@@ -51,13 +57,14 @@ def detect_contradictions(latest_a: Dict[str, str], latest_b: Dict[str, str], mo
 
     # Values vs boundary mismatch: if one lists "freedom" and the other lists "control"/"structure" (very crude)
     def token_set(t: str):
-        import re
-        return set(re.findall(r"[a-zA-Z']{4,}", (t or "").lower()))
+        return set(_TOK_RE.findall((t or "").lower()))
 
     if mode != "solo":
         va = token_set(latest_a.get("values_top2","") + " " + latest_a.get("one_boundary",""))
         vb = token_set(latest_b.get("values_top2","") + " " + latest_b.get("one_boundary",""))
-        if ("freedom" in va and ("control" in vb or "structure" in vb)) or ("freedom" in vb and ("control" in va or "structure" in va)):
+        va_f, va_s = not _FREEDOM_TOKS.isdisjoint(va), not _STRUCTURE_TOKS.isdisjoint(va)
+        vb_f, vb_s = not _FREEDOM_TOKS.isdisjoint(vb), not _STRUCTURE_TOKS.isdisjoint(vb)
+        if (va_f and vb_s) or (vb_f and va_s):
             add_gap("pair", "Freedom vs structure could become a recurring negotiation",
                     ["One side emphasizes freedom; the other emphasizes control/structure (token check)."])
 
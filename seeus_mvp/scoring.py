@@ -1,74 +1,183 @@
-import re
+import math
+import string
+import threading
+from functools import lru_cache
 
-def _extract_numbers(text):
-    return [float(x) for x in re.findall(r"(?<!\d)(\d+(?:\.\d+)?)", text or "")]
+class _WordCharsOnly(dict):
+    # str.translate table: ASCII letters and apostrophes map to themselves, everything else
+    # (including any non-Latin-1 character) to a space.
+    def __missing__(self, key):
+        return " "
 
+# Tokens are runs of 3+ ASCII letters/apostrophes, as [a-zA-Z']{3,} would match: one C-level
+# translate pass plus split(), no regex engine. Latin-1 is pre-filled so typical answers
+# never reach __missing__.
+_TOK_TABLE = _WordCharsOnly({i: " " for i in range(256)})
+_TOK_TABLE.update({ord(c): c for c in string.ascii_letters + "'"})
+
+# (dimension, answer field, confidence) for the dimensions score_duo rates by token overlap.
+_OVERLAP_DIMS = (
+    ("values", "values_hierarchy", 0.5),    # values alignment (rough)
+    ("cost", "cost_tolerance", 0.4),        # alignment is less important than awareness; still use similarity
+    ("conflict", "repair_capacity", 0.4),   # repair capacity (rough)
+    ("power", "power_decisions", 0.4),
+    ("stress", "stress_behavior", 0.4),
+    ("agency", "agency_choice", 0.3),       # not compatibility—risk indicator. Still return as dimension.
+)
+_TEXT_FIELDS = tuple(field for _, field, _ in _OVERLAP_DIMS)
+# score_duo's dimensions in display order.
+_DUO_DIM_ORDER = ("values", "cost", "conflict", "power", "stress", "attachment", "agency")
+_OVERLAP_REASON = "Token overlap (MVP)."
+_MISSING_CLOSENESS = (0.0, 0.2, "Missing numeric closeness.")
+# Attachment score by ceil(closeness distance), 0..10: <=1 -> 9.0, <=3 -> 7.5, else 6.0.
+_ATTACH_LUT = (9.0, 9.0, 7.5, 7.5, 6.0, 6.0, 6.0, 6.0, 6.0, 6.0, 6.0)
+
+# (answer field, dimension) for score_solo, which rates on presence of an answer alone.
+_SOLO_FIELDS = (
+    ("values_hierarchy", "values"),
+    ("cost_tolerance", "cost"),
+    ("repair_capacity", "conflict"),
+    ("emotional_labor", "load"),
+    ("closeness_numeric", "attachment"),
+    ("power_decisions", "power"),
+    ("stress_behavior", "stress"),
+    ("pattern_role", "pattern"),
+    ("future_self", "future"),
+    ("agency_choice", "agency"),
+)
+_PRESENCE_REASON = "Based on presence of an answer (MVP)."
+# Score tuples are never mutated, so every call shares these two.
+_SOLO_ANSWERED = (7.0, 0.5, _PRESENCE_REASON)
+_SOLO_UNANSWERED = (0.0, 0.5, _PRESENCE_REASON)
+
+# Cached by answer string: score_solo and score_duo parse the same closeness answers.
+@lru_cache(maxsize=8192)
 def _first_0_10(text):
-    for n in _extract_numbers(text):
-        if 0 <= n <= 10:
-            return float(n)
+    # Hand scan for the numbers (?<!\d)(\d+(?:\.\d+)?) would match (digits, optionally "." and digits),
+    # stopping at the first in-range one. Answers here are short, so skipping the regex
+    # engine and its match objects is the cheaper path. isdecimal() is what \d matches.
+    s = text or ""
+    i, n = 0, len(s)
+    while i < n:
+        if not s[i].isdecimal():
+            i += 1
+            continue
+        j = i + 1
+        while j < n and s[j].isdecimal():
+            j += 1
+        if j + 1 < n and s[j] == "." and s[j + 1].isdecimal():
+            j += 2
+            while j < n and s[j].isdecimal():
+                j += 1
+        v = float(s[i:j])
+        if 0 <= v <= 10:
+            return v
+        i = j
     return None
 
-def _text_similarity(a, b):
-    a_tokens = set(re.findall(r"[a-zA-Z']{3,}", (a or "").lower()))
-    b_tokens = set(re.findall(r"[a-zA-Z']{3,}", (b or "").lower()))
+# Token -> bit position. Token sets are stored as int bitsets (with their size cached) so
+# overlap is one AND plus a popcount instead of building new set objects per comparison.
+# Bitsets are as wide as the highest id they contain, so the vocabulary is capped: when a
+# pair's unseen tokens would push it past _VOCAB_LIMIT, ids start over and the caches built
+# on the old ones are dropped. Resets and encoding both happen under _vocab_lock, so the two
+# sides of a comparison always share one vocabulary.
+_VOCAB_LIMIT = 16384
+_VOCAB = {}
+_vocab_lock = threading.Lock()
+
+@lru_cache(maxsize=8192)
+def _tokens(text):
+    # Keyed by the answer string, so repeated answers ("I don't know") and the same respondent
+    # compared against many partners tokenize once. Lowercase the kept tokens, not the whole answer.
+    return frozenset(t.lower() for t in text.translate(_TOK_TABLE).split() if len(t) >= 3)
+
+@lru_cache(maxsize=8192)
+def _bitset(text):
+    # (bits, token count). Only called under _vocab_lock.
+    bits = 0
+    for t in _tokens(text):
+        bits |= 1 << _VOCAB.setdefault(t, len(_VOCAB))
+    return bits, bits.bit_count()
+
+@lru_cache(maxsize=1024)
+def _prepare_texts(texts):
+    # {field: (token bitset, count)} for one respondent; only called under _vocab_lock.
+    # Keyed by the answer texts rather than id(profile): ids are reused once a dict is freed,
+    # and app.py rebuilds the answer dicts on every rerun anyway.
+    return {k: _bitset(t) for k, t in zip(_TEXT_FIELDS, texts)}
+
+def _reserve_vocab(texts):
+    # Under _vocab_lock: make room for every token in texts. False if they wouldn't fit even
+    # in an empty vocabulary.
+    sets = [_tokens(t) for t in texts]
+    if len(_VOCAB) + sum(map(len, sets)) <= _VOCAB_LIMIT:
+        return True
+    unique = frozenset().union(*sets)
+    if len(_VOCAB) + sum(1 for t in unique if t not in _VOCAB) <= _VOCAB_LIMIT:
+        return True
+    if len(unique) > _VOCAB_LIMIT:
+        return False
+    _VOCAB.clear()
+    _bitset.cache_clear()
+    _prepare_texts.cache_clear()
+    return True
+
+def _jaccard(a, b):
+    # |A & B| / |A | B|, with the union size taken from the cached counts: |A| + |B| - |A & B|.
+    a_bits, a_count = a
+    b_bits, b_count = b
+    if not a_count or not b_count:
+        return 0.0
+    inter = (a_bits & b_bits).bit_count()
+    return inter / (a_count + b_count - inter)
+
+def _set_jaccard(a_tokens, b_tokens):
     if not a_tokens or not b_tokens:
         return 0.0
     return len(a_tokens & b_tokens) / len(a_tokens | b_tokens)
 
+def _overlaps(a, b):
+    # {field: Jaccard similarity} for the token-overlap fields.
+    texts_a = tuple(a.get(k) or "" for k in _TEXT_FIELDS)
+    texts_b = tuple(b.get(k) or "" for k in _TEXT_FIELDS)
+    with _vocab_lock:
+        if _reserve_vocab(texts_a + texts_b):
+            ta, tb = _prepare_texts(texts_a), _prepare_texts(texts_b)
+            return {k: _jaccard(ta[k], tb[k]) for k in _TEXT_FIELDS}
+    # This pair alone has more distinct words than the bitset vocabulary holds.
+    return {k: _set_jaccard(_tokens(x), _tokens(y)) for k, x, y in zip(_TEXT_FIELDS, texts_a, texts_b)}
+
 def overall_score(scores):
-    vals = [v[0] for v in scores.values() if v[0] > 0]
-    return sum(vals) / len(vals) if vals else 0.0
+    # One pass, no intermediate list; unscored (0) dimensions don't count.
+    total, n = 0.0, 0
+    for v in scores.values():
+        if v[0] > 0:
+            total += v[0]
+            n += 1
+    return total / n if n else 0.0
 
 def score_duo(a, b):
     # MVP heuristic: combine numeric closeness gap + token overlap for a few key items
-    out = {}
-
-    # Values alignment (rough)
-    out["values"] = (4.0 + 6.0*_text_similarity(a.get("values_hierarchy",""), b.get("values_hierarchy","")), 0.5, "Token overlap (MVP).")
-
-    # Cost tolerance (rough—alignment is less important than awareness; still use similarity)
-    out["cost"] = (4.0 + 6.0*_text_similarity(a.get("cost_tolerance",""), b.get("cost_tolerance","")), 0.4, "Token overlap (MVP).")
-
-    # Repair capacity (rough)
-    out["conflict"] = (4.0 + 6.0*_text_similarity(a.get("repair_capacity",""), b.get("repair_capacity","")), 0.4, "Token overlap (MVP).")
-
-    # Power / decisions
-    out["power"] = (4.0 + 6.0*_text_similarity(a.get("power_decisions",""), b.get("power_decisions","")), 0.4, "Token overlap (MVP).")
-
-    # Stress behavior
-    out["stress"] = (4.0 + 6.0*_text_similarity(a.get("stress_behavior",""), b.get("stress_behavior","")), 0.4, "Token overlap (MVP).")
+    sims = _overlaps(a, b)
+    out = {
+        dim: (4.0 + 6.0*sims[field], confidence, _OVERLAP_REASON)
+        for dim, field, confidence in _OVERLAP_DIMS
+    }
 
     # Attachment numeric gap
     ca = _first_0_10(a.get("closeness_numeric",""))
     cb = _first_0_10(b.get("closeness_numeric",""))
     if ca is not None and cb is not None:
         d = abs(ca - cb)
-        out["attachment"] = (9.0 if d<=1 else (7.5 if d<=3 else 6.0), 0.7, f"Closeness distance ~{d:g}.")
+        out["attachment"] = (_ATTACH_LUT[math.ceil(d)], 0.7, f"Closeness distance ~{d:g}.")
     else:
-        out["attachment"] = (0.0, 0.2, "Missing numeric closeness.")
+        out["attachment"] = _MISSING_CLOSENESS
 
-    # Agency (not compatibility—risk indicator). Still return as dimension.
-    out["agency"] = (4.0 + 6.0*_text_similarity(a.get("agency_choice",""), b.get("agency_choice","")), 0.3, "Token overlap (MVP).")
-
-    return out
+    return {dim: out[dim] for dim in _DUO_DIM_ORDER}
 
 def score_solo(a):
-    out = {}
     # Provide completeness-based scores so solo report still works.
-    for key, dim in [
-        ("values_hierarchy","values"),
-        ("cost_tolerance","cost"),
-        ("repair_capacity","conflict"),
-        ("emotional_labor","load"),
-        ("closeness_numeric","attachment"),
-        ("power_decisions","power"),
-        ("stress_behavior","stress"),
-        ("pattern_role","pattern"),
-        ("future_self","future"),
-        ("agency_choice","agency"),
-    ]:
-        out[dim] = (7.0 if a.get(key) else 0.0, 0.5, "Based on presence of an answer (MVP).")
+    out = {dim: _SOLO_ANSWERED if a.get(key) else _SOLO_UNANSWERED for key, dim in _SOLO_FIELDS}
 
     # bump if numeric anchor exists
     cn = _first_0_10(a.get("closeness_numeric",""))
@@ -0,0 +1,73 @@
+# ttl_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Small thread-safe in-process cache; entries expire `ttl` seconds after they are stored.
+
+    At most `maxsize` entries are kept, evicting the least recently used.
+    """
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidate(); get_or_set() only stores a load started in the same generation.
+        self._generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return default
+            expires_at, value = hit
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        # Caller holds the lock.
+        now = time.monotonic()
+        self._data[key] = (now + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            # Drop expired entries first so a burst of one-off keys doesn't push out live ones,
+            # then fall back to least recently used.
+            for k in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+                del self._data[k]
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            generation = self._generation
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            # load() runs unlocked, so an invalidate() can land while it is in flight; its
+            # result may predate that write, so return it but don't cache it.
+            value = load()
+            with self._lock:
+                if self._generation == generation:
+                    self._store(key, value)
+        return value
+
+    def invalidate(self, key: Hashable = _MISSING) -> None:
+        # No key clears everything.
+        with self._lock:
+            self._generation += 1
+            if key is _MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)